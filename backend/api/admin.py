@@ -1,15 +1,15 @@
 """Admin API endpoints for feedback and metrics."""
 from datetime import date, datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.deps import get_admin_user, get_reviewer_user
-from database.connection import get_db
+from database.connection import get_db, get_read_db
 from models.analysis import FlaggedClause
 from models.feedback import AnalysisFeedback, ModelMetrics
 from models.user import User
@@ -71,6 +71,21 @@ class PendingReviewItem(BaseModel):
     has_feedback: bool
 
 
+class VectorIndexStatusResponse(BaseModel):
+    """Schema for clause embedding ANN index status."""
+
+    index_name: str
+    state: str
+    method: Optional[str]
+    size_bytes: Optional[int]
+    definition: Optional[str]
+    ef_search: int
+    build_phase: Optional[str]
+    build_tuples_done: Optional[int]
+    build_tuples_total: Optional[int]
+    recall: Optional[float]
+
+
 # Endpoints
 @router.post("/feedback", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
 async def submit_feedback(
@@ -127,7 +142,7 @@ async def submit_feedback(
 @router.get("/pending-reviews", response_model=List[PendingReviewItem])
 async def get_pending_reviews(
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _current_user: User = Depends(get_reviewer_user),
 ) -> List[PendingReviewItem]:
     """
@@ -181,7 +196,7 @@ async def get_pending_reviews(
 @router.get("/metrics", response_model=List[MetricsResponse])
 async def get_metrics(
     days: int = 30,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _current_user: User = Depends(get_reviewer_user),
 ) -> List[MetricsResponse]:
     """
@@ -197,6 +212,37 @@ async def get_metrics(
     return [MetricsResponse.model_validate(m) for m in metrics]
 
 
+@router.get("/vector-index", response_model=VectorIndexStatusResponse)
+async def get_vector_index(
+    language: Literal["pl", "en"] = "pl",
+    sample_size: int = Query(20, ge=0, le=200),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    _current_user: User = Depends(get_admin_user),
+) -> VectorIndexStatusResponse:
+    """
+    Get build state and estimated recall of a language's clause embedding ANN index.
+
+    Requires admin privileges.
+
+    - **language**: Clause language whose index is reported (default: pl)
+    - **sample_size**: Number of sampled clause embeddings used to estimate recall
+      (default: 20, 0 skips the recall check)
+    - **limit**: Top-k size used for the recall estimate (default: 10)
+    """
+    from services.vector_index import get_vector_index_status, measure_vector_index_recall
+
+    index_status = await get_vector_index_status(db, language=language)
+
+    recall = None
+    if sample_size > 0 and index_status["state"] == "ready":
+        recall = await measure_vector_index_recall(
+            db, sample_size=sample_size, limit=limit, language=language
+        )
+
+    return VectorIndexStatusResponse(**index_status, recall=recall)
+
+
 @router.get("/health")
 async def admin_health_check() -> dict:
     """Health check endpoint for admin API."""
@@ -7,7 +7,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from database.connection import get_db
+from database.connection import get_db, get_read_db
 from models.analysis import Analysis, FlaggedClause
 from models.document import Document
 from schemas.analysis import (
@@ -79,7 +79,7 @@ async def get_document_analysis(
 @router.get("/{analysis_id}", response_model=AnalysisDetailResponse)
 async def get_analysis(
     analysis_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> AnalysisDetailResponse:
     """
     Get detailed analysis results including all flagged clauses.
@@ -219,7 +219,7 @@ async def get_flagged_clauses(
     min_confidence: Optional[float] = Query(
         None, ge=0.0, le=1.0, description="Minimum confidence score"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[FlaggedClauseResponse]:
     """
     Get flagged clauses for an analysis with optional filters.
@@ -33,6 +33,7 @@ from schemas.document import (
     MAX_FILE_SIZE_BYTES,
     DocumentUploadResponse,
 )
+from services.result_cache import build_result_cache_key, clone_analysis, find_cached_analysis
 from services.storage import storage_service
 
 router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
@@ -238,18 +239,28 @@ async def upload_document(
         db.add(document)
         await db.flush()  # Get the ID assigned
 
-        # Queue document processing task
-        from tasks.document_processing import process_document
-
-        task = process_document.delay(
-            document_id=str(document_id),
-            object_name=object_name,
-            mime_type=file.content_type or "application/octet-stream",
-            language=language,
-        )
+        # Reuse the analysis of an identical, already analyzed file if there is one
+        cached_analysis = None
+        analysis = None
+        if analysis_mode == "offline":
+            cache_key = await build_result_cache_key(db, document.user_id)
+            cached_analysis = await find_cached_analysis(db, checksum, language, cache_key)
+
+        if cached_analysis is not None:
+            analysis = await clone_analysis(db, cached_analysis, document)
+        else:
+            # Queue document processing task
+            from tasks.document_processing import process_document
+
+            task = process_document.delay(
+                document_id=str(document_id),
+                object_name=object_name,
+                mime_type=file.content_type or "application/octet-stream",
+                language=language,
+            )
 
-        # Update document with task ID
-        document.celery_task_id = task.id
+            # Update document with task ID
+            document.celery_task_id = task.id
         await db.commit()
 
         # Grant access to guest if applicable
@@ -260,9 +271,10 @@ async def upload_document(
             document_id=document_id,
             filename=file.filename or "unknown",
             size_bytes=actual_file_size,
-            pages=None,  # Will be determined during processing
+            pages=document.pages,  # Determined during processing unless reused
             upload_url=upload_url,
             created_at=document.created_at,
+            analysis_id=analysis.id if analysis is not None else None,
         )
 
     except ValueError as e:
@@ -1,28 +1,42 @@
 """API endpoints for job status tracking."""
+import json
+import logging
+from typing import AsyncIterator, Optional
+
 from celery.result import AsyncResult
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from redis import RedisError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from celery_app import celery_app
-from database.connection import get_db
+from config import settings
+from database.connection import get_db, get_db_context
 from models.analysis import Analysis
 from models.document import Document
+from services.job_events import TERMINAL_STATUSES, JobEventSubscription, subscribe_job_events
+from services.job_status_cache import cache_job_status, get_cached_job_status
 
-router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
 
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
 
-@router.get("/{job_id}")
-async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)) -> dict:
-    """
-    Get status of an async job.
+# Reconnect delay suggested to EventSource clients
+JOB_EVENTS_RETRY_MS = 3000
 
-    - **job_id**: Celery task ID
 
-    Returns job status and result/error information.
+async def _get_job_status(job_id: str, db: AsyncSession) -> dict:
+    """
+    Get the status of a job.
 
     Uses database as primary source of truth to avoid Celery deserialization issues.
+    Statuses of finished jobs are cached briefly, since clients keep polling them.
     """
+    cached = await get_cached_job_status(job_id)
+    if cached is not None:
+        return cached
+
     response = {
         "job_id": job_id,
         "status": "queued",
@@ -64,11 +78,13 @@ async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)) -> dic
                     if analysis
                     else None,
                 }
+                await cache_job_status(job_id, response)
                 return response
 
             elif document.status == "failed":
                 response["status"] = "failed"
                 response["error"] = "Document processing failed"
+                await cache_job_status(job_id, response)
                 return response
 
             elif document.status == "processing":
@@ -134,6 +150,96 @@ async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)) -> dic
         }
 
 
+@router.get("/{job_id}")
+async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Get status of an async job.
+
+    - **job_id**: Celery task ID
+
+    Returns job status and result/error information.
+    """
+    return await _get_job_status(job_id, db)
+
+
+def _format_event(data: dict) -> str:
+    """Format a job status as a Server-Sent Event."""
+    return f"event: status\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_job_events(
+    request: Request,
+    job_id: str,
+    snapshot: dict,
+    subscription: Optional[JobEventSubscription],
+) -> AsyncIterator[str]:
+    """Send the current status, then every change until the job finishes."""
+    try:
+        yield f"retry: {JOB_EVENTS_RETRY_MS}\n"
+        yield _format_event(snapshot)
+        if subscription is None or snapshot["status"] in TERMINAL_STATUSES:
+            return
+
+        while not await request.is_disconnected():
+            event = await subscription.next_event(timeout=settings.job_events_heartbeat_seconds)
+            if event is None:
+                # Events are delivered at most once; re-check so a lost final one can't
+                # keep the stream open (the request's session is closed by now)
+                async with get_db_context() as db:
+                    status = await _get_job_status(job_id, db)
+                if status["status"] in TERMINAL_STATUSES:
+                    yield _format_event(status)
+                    return
+                # Comment line; keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield _format_event(event)
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        if subscription is not None:
+            await subscription.close()
+
+
+@router.get("/{job_id}/events")
+async def stream_job_status(
+    job_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream status changes of an async job as Server-Sent Events.
+
+    - **job_id**: Celery task ID
+
+    The first ``status`` event carries the current status (same payload as
+    GET /api/v1/jobs/{job_id}); each further one a stage transition published
+    by the worker. The stream ends once the job completed or failed; between
+    events each heartbeat re-checks the status, in case the final event was
+    lost. Without Redis only the current status is sent and clients fall back
+    to polling.
+    """
+    # Subscribe first so no transition between the snapshot and the stream is lost
+    try:
+        subscription = await subscribe_job_events(job_id)
+    except RedisError as e:
+        logger.warning(f"Job events unavailable, sending status only: {e}")
+        subscription = None
+
+    try:
+        snapshot = await _get_job_status(job_id, db)
+    except BaseException:
+        if subscription is not None:
+            await subscription.close()
+        raise
+
+    return StreamingResponse(
+        _stream_job_events(request, job_id, snapshot, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/test")
 async def test_celery() -> dict:
     """
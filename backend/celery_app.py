@@ -1,4 +1,6 @@
 """Celery application configuration."""
+import os
+
 import sentry_sdk
 from celery import Celery
 from celery.schedules import crontab
@@ -6,6 +8,11 @@ from sentry_sdk.integrations.celery import CeleryIntegration
 
 from config import settings
 
+# Worker children share metrics through this directory (prometheus_client
+# multiprocess mode); it must exist before any metric is defined
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
 # Initialize Sentry if DSN is configured
 if settings.sentry_dsn:
     sentry_sdk.init(
@@ -19,7 +26,7 @@ celery_app = Celery(
     "fairpact",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=["tasks.document_processing", "tasks.sync"],
+    include=["tasks.document_processing", "tasks.sync", "tasks.worker"],
 )
 
 # Configure Celery
@@ -34,6 +41,8 @@ celery_app.conf.update(
     task_soft_time_limit=270,  # 4.5 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=50,
+    # Children warm up before reporting they are up (tasks.worker)
+    worker_proc_alive_timeout=settings.celery_worker_proc_alive_timeout,
 )
 
 # Task routing (optional - for future scaling)
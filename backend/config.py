@@ -1,6 +1,6 @@
 """Application configuration using Pydantic settings."""
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import SecretStr, field_validator
 from pydantic_settings import BaseSettings
@@ -18,6 +18,16 @@ class Settings(BaseSettings):
     database_url: SecretStr
     database_pool_size: int = 20
     database_max_overflow: int = 10
+    # Read replica for read-only endpoints (empty: read from the primary)
+    database_read_url: SecretStr = SecretStr("")
+    database_read_max_lag_seconds: float = 2.0  # Fall back to the primary beyond this
+    database_read_lag_check_interval: float = 5.0  # Seconds between lag checks
+    # Connections go through a transaction-mode PgBouncer (no statement caching)
+    database_pgbouncer: bool = False
+    # Pool of each Celery worker process (kept open across its tasks)
+    database_worker_pool_size: int = 2
+    database_worker_max_overflow: int = 2
+    database_hnsw_ef_search: int = 40  # HNSW candidate list size (recall vs latency)
 
     # External source database (prohibited clauses)
     source_database_url: SecretStr = SecretStr("")
@@ -49,12 +59,35 @@ class Settings(BaseSettings):
     # OCR
     tesseract_cmd: str = "/usr/bin/tesseract"
     tesseract_languages: str = "pol+eng"
+    ocr_workers: int = 4  # Pages OCR-ed concurrently
+    ocr_dpi: int = 300  # Resolution of the full-quality pass
+    ocr_adaptive: bool = True  # Fast pass first, full pass only for low-confidence pages
+    ocr_fast_dpi: int = 200  # Resolution of the fast pass (no preprocessing)
+    ocr_min_confidence: float = 0.80  # Fast-pass confidence below which a page is redone
 
     # Analysis thresholds
     analysis_threshold_low: float = 0.80  # Minimum similarity to flag a clause
     analysis_threshold_medium: float = 0.86  # Threshold for medium risk
     analysis_threshold_high: float = 0.93  # Threshold for high risk
 
+    # Analysis embedding
+    analysis_embedding_batch_size: int = 64  # Segments encoded per model forward pass
+    analysis_embedding_backend: Literal["torch", "onnx", "onnx-int8"] = "torch"
+    analysis_embedding_onnx_int8_file: str = "onnx/model_quint8_avx2.onnx"  # INT8 model file
+    analysis_vector_backend: Literal["pgvector", "memory"] = "pgvector"  # "memory" = in-process
+    analysis_index_snapshot_dir: str = ""  # Shared memory-mapped index snapshots ("" = off)
+    analysis_embedding_cache_size: int = 20000  # In-process LRU entries (0 = off)
+    analysis_clause_token_cache_size: int = 20000  # Clause keyword token sets (0 = off)
+    analysis_embedding_cache_ttl: int = 604800  # Redis tier TTL in seconds (0 = off)
+    # Redis tier location; kept off the Celery broker DB (REDIS_URL / CELERY_BROKER_URL)
+    analysis_embedding_cache_redis_url: str = "redis://localhost:6379/1"
+    analysis_result_cache_enabled: bool = True  # Reuse analyses of identical uploaded files
+
+    # Shared embedding service ("" = load the model in every process)
+    embedding_service_address: str = ""  # unix:///path.sock or tcp://host:port
+    embedding_service_max_batch: int = 128  # Max texts encoded in one merged batch
+    embedding_service_max_wait_ms: int = 10  # Max wait for more requests to join a batch
+
     # CORS
     allowed_origins: List[str] = [
         "http://localhost:3000",
@@ -81,6 +114,17 @@ class Settings(BaseSettings):
     # Celery
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
+    # Seconds finished job statuses stay cached in Redis (0 disables the cache)
+    job_status_cache_ttl: int = 30
+    # Keep-alive interval of job progress streams (GET /api/v1/jobs/{id}/events)
+    job_events_heartbeat_seconds: float = 15.0
+    # Load model, clause index and DB connections when a worker child starts
+    celery_worker_warmup: bool = True
+    # Seconds a new worker child may take to report it is up; covers the warm-up
+    celery_worker_proc_alive_timeout: float = 120.0
+    # Port the worker's parent process serves all children's metrics on (0 = off);
+    # requires PROMETHEUS_MULTIPROC_DIR in the worker environment
+    celery_metrics_port: int = 0
 
     @field_validator("allowed_origins", mode="before")
     @classmethod
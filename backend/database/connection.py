@@ -1,12 +1,29 @@
 """Database connection and session management."""
+import asyncio
+import logging
+import os
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Coroutine, Optional, TypeVar
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
 def get_database_url() -> str:
     """Get async database URL."""
@@ -15,27 +32,149 @@ def get_database_url() -> str:
     )
 
 
+def _unique_statement_name() -> str:
+    """Name prepared statements uniquely: PgBouncer may run them on a reused server connection."""
+    return f"__asyncpg_{uuid4()}__"
+
+
+def get_read_database_url() -> str:
+    """Get async database URL of the read replica (empty if none is configured)."""
+    return settings.database_read_url.get_secret_value().replace(
+        "postgresql://", "postgresql+asyncpg://"
+    )
+
+
+def get_connect_args() -> dict:
+    """
+    Get asyncpg connection arguments.
+
+    Behind a transaction-mode PgBouncer consecutive transactions of one client
+    connection may run on different server connections, so prepared statements
+    are neither cached (by asyncpg or SQLAlchemy) nor given reusable names.
+    PgBouncer also rejects unknown startup parameters; hnsw.ef_search is then
+    set per transaction by the vector search instead.
+    """
+    if settings.database_pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {
+        "server_settings": {
+            # Search breadth of the HNSW index on prohibited_clauses.embedding
+            "hnsw.ef_search": str(settings.database_hnsw_ef_search),
+        }
+    }
+
+
+def get_engine_options(pool_size: int, max_overflow: int) -> dict:
+    """
+    Get create_async_engine() options for the configured connection mode.
+
+    With DATABASE_PGBOUNCER PgBouncer does the pooling: connections are not
+    pooled here (NullPool) and, being freshly opened, not pre-pinged.
+    """
+    if settings.database_pgbouncer:
+        return {
+            "echo": settings.debug,
+            "poolclass": NullPool,
+            "connect_args": get_connect_args(),
+        }
+    return {
+        "echo": settings.debug,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": True,
+        "connect_args": get_connect_args(),
+    }
+
+
+def _create_session_factory(bind: AsyncEngine) -> async_sessionmaker:
+    """Create a session factory; the primary, replica and worker sessions share its options."""
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
 # Create async engine for FastAPI (web server context)
 engine = create_async_engine(
     get_database_url(),
-    echo=settings.debug,
-    pool_size=settings.database_pool_size,
-    max_overflow=settings.database_max_overflow,
-    pool_pre_ping=True,
+    **get_engine_options(settings.database_pool_size, settings.database_max_overflow),
 )
 
 # Create async session factory for FastAPI
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+AsyncSessionLocal = _create_session_factory(engine)
+
+# Create async engine for read-only endpoints (None: read from the primary)
+read_engine: Optional[AsyncEngine] = (
+    create_async_engine(
+        get_read_database_url(),
+        **get_engine_options(settings.database_pool_size, settings.database_max_overflow),
+    )
+    if get_read_database_url()
+    else None
 )
+ReadSessionLocal = _create_session_factory(read_engine) if read_engine is not None else None
 
 # Base class for models
 Base = declarative_base()
 
+# Replication delay of the replica; 0 when it has replayed everything it received
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+@dataclass
+class _ReplicaStatus:
+    """Outcome of the latest replica lag check of this process."""
+
+    usable: bool = False
+    checked_at: float = float("-inf")
+
+
+_replica_status = _ReplicaStatus()
+
+
+async def replica_is_usable() -> bool:
+    """
+    Check whether reads can go to the replica.
+
+    It must be configured, reachable and at most DATABASE_READ_MAX_LAG_SECONDS
+    behind the primary. The lag is measured at most once per
+    DATABASE_READ_LAG_CHECK_INTERVAL seconds, so requests do not pay for it.
+    """
+    if read_engine is None:
+        return False
+
+    now = time.monotonic()
+    if now - _replica_status.checked_at >= settings.database_read_lag_check_interval:
+        # Set first so concurrent requests do not check as well
+        _replica_status.checked_at = now
+        try:
+            async with read_engine.connect() as conn:
+                lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+        except Exception as e:
+            logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+            _replica_status.usable = False
+        else:
+            _replica_status.usable = lag <= settings.database_read_max_lag_seconds
+            if not _replica_status.usable:
+                logger.warning(f"Read replica lags {lag:.1f}s, reading from the primary")
+
+    return _replica_status.usable
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session (for FastAPI)."""
@@ -50,6 +189,18 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a read-only database session (for FastAPI).
+
+    Uses the read replica when one is configured and keeping up, otherwise the
+    primary. Nothing is committed, so only use it for endpoints that only read.
+    """
+    session_factory = ReadSessionLocal if await replica_is_usable() else AsyncSessionLocal
+    async with session_factory() as session:
+        yield session
+
+
 @asynccontextmanager
 async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
     """Context manager for database session (for FastAPI)."""
@@ -64,40 +215,103 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+@dataclass
+class _WorkerState:
+    """Event loop and engine owned by one worker process."""
+
+    pid: int
+    loop: asyncio.AbstractEventLoop
+    engine: AsyncEngine
+    session_factory: async_sessionmaker
+
+
+# Created lazily in each process; state inherited through fork is left untouched
+_worker_state: Optional[_WorkerState] = None
+
+
+def _get_worker_state() -> _WorkerState:
+    """Get this process's worker loop and engine, creating them on first use."""
+    global _worker_state
+    if _worker_state is None or _worker_state.pid != os.getpid():
+        # Tasks of a worker child run one at a time, so a small pool suffices
+        worker_engine = create_async_engine(
+            get_database_url(),
+            **get_engine_options(
+                settings.database_worker_pool_size, settings.database_worker_max_overflow
+            ),
+        )
+        _worker_state = _WorkerState(
+            pid=os.getpid(),
+            loop=asyncio.new_event_loop(),
+            engine=worker_engine,
+            session_factory=_create_session_factory(worker_engine),
+        )
+    return _worker_state
+
+
+def run_in_worker_loop(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the event loop of this worker process.
+
+    Use instead of asyncio.run() in Celery tasks: the loop, and with it the
+    connection pool of get_celery_db_context(), lives as long as the process.
+    If the task is interrupted (e.g. by a soft time limit), the coroutine is
+    cancelled so nothing is left pending on the loop for the next task.
+    """
+    loop = _get_worker_state().loop
+    task = loop.create_task(coro)
+    try:
+        return loop.run_until_complete(task)
+    except BaseException:
+        if not task.done():
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        raise
+
+
+def dispose_worker_state() -> None:
+    """Close the worker engine's connections and the worker event loop."""
+    global _worker_state
+    state = _worker_state
+    if state is None or state.pid != os.getpid():
+        return
+    _worker_state = None
+    state.loop.run_until_complete(state.engine.dispose())
+    state.loop.close()
+
+
 @asynccontextmanager
 async def get_celery_db_context() -> AsyncGenerator[AsyncSession, None]:
     """
     Context manager for database session in Celery tasks.
 
-    Creates a fresh engine and session for each task to avoid
-    event loop issues with prefork workers.
+    On the worker loop (run_in_worker_loop) sessions come from the engine of
+    this worker process, reused across tasks. Anywhere else, e.g. in scripts,
+    a short-lived engine is created for the session and disposed afterwards.
     """
-    # Create a fresh engine for this task (not shared with other loops)
-    task_engine = create_async_engine(
-        get_database_url(),
-        echo=settings.debug,
-        pool_size=5,  # Smaller pool for task
-        max_overflow=2,
-        pool_pre_ping=True,
-    )
-
-    task_session_factory = async_sessionmaker(
-        task_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
-
-    async with task_session_factory() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    state = _worker_state
+    if state is not None and state.pid == os.getpid() and state.loop is asyncio.get_running_loop():
+        task_engine = None
+        session_factory = state.session_factory
+    else:
+        task_engine = create_async_engine(
+            get_database_url(),
+            **get_engine_options(
+                settings.database_worker_pool_size, settings.database_worker_max_overflow
+            ),
+        )
+        session_factory = _create_session_factory(task_engine)
 
-    # Dispose the engine to clean up connections
-    await task_engine.dispose()
+    try:
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+    finally:
+        if task_engine is not None:
+            await task_engine.dispose()
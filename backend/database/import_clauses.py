@@ -14,23 +14,19 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from sentence_transformers import SentenceTransformer
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from database.connection import get_db_context
 from models.clause import ClauseCategory, ClauseLegalReference, LegalReference, ProhibitedClause
+from services.analysis import get_embedding_model
+from services.clause_corpus import bump_corpus_version
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize sentence transformer model for embeddings (384 dimensions)
-MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"  # 384 dimensions
-logger.info(f"Loading embedding model: {MODEL_NAME}")
-embedding_model = SentenceTransformer(MODEL_NAME)
-
 
 def fetch_external_clauses() -> List[Dict[str, Any]]:
     """Fetch prohibited clauses from external database.
@@ -153,13 +149,16 @@ def fetch_external_clauses() -> List[Dict[str, Any]]:
 def generate_embedding(text: str) -> List[float]:
     """Generate vector embedding for text using sentence transformers.
 
+    Uses the shared embedding service when EMBEDDING_SERVICE_ADDRESS is set,
+    otherwise the model is loaded into this process on first use.
+
     Args:
         text: Input text to generate embedding for.
 
     Returns:
         List of floats representing the embedding vector.
     """
-    embedding = embedding_model.encode(text, convert_to_numpy=True)
+    embedding = get_embedding_model().encode(text, convert_to_numpy=True)
     return embedding.tolist()
 
 
@@ -367,6 +366,9 @@ async def import_all_clauses() -> None:
         # Update category clause count
         category.clause_count = imported_count
 
+        # Invalidate clause indexes cached by workers and API processes
+        version = await bump_corpus_version(session)
+
         await session.commit()
 
         logger.info("=" * 60)
@@ -374,6 +376,7 @@ async def import_all_clauses() -> None:
         logger.info(f"Total clauses processed: {len(external_clauses)}")
         logger.info(f"Successfully imported: {imported_count}")
         logger.info(f"Skipped (duplicates/errors): {skipped_count}")
+        logger.info(f"Clause corpus version: {version}")
         logger.info("=" * 60)
 
 
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import AsyncSessionLocal
 from models.clause import ClauseCategory, LegalReference, ProhibitedClause
+from services.clause_corpus import bump_corpus_version
 
 # Categories for prohibited clauses
 CATEGORIES = [
@@ -596,6 +597,10 @@ async def run_seed():
         clause_count = await seed_clauses(session, category_map)
         print(f"  {clause_count} new clauses added")
 
+        if clause_count:
+            version = await bump_corpus_version(session)
+            print(f"  Clause corpus version bumped to {version}")
+
         await session.commit()
         print("Seed completed successfully!")
 
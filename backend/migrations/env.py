@@ -10,6 +10,7 @@ from database.connection import Base
 from models.analysis import Analysis, FlaggedClause  # noqa: F401
 from models.clause import (  # noqa: F401
     ClauseCategory,
+    ClauseCorpusVersion,
     ClauseLegalReference,
     LegalReference,
     ProhibitedClause,
@@ -0,0 +1,35 @@
+"""Add clause corpus version table
+
+Revision ID: 012a40f6d69d
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012a40f6d69d"
+down_revision: Union[str, None] = "a1b2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add single-row clause corpus version table."""
+    op.create_table(
+        "clause_corpus_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.CheckConstraint("id = 1", name="single_corpus_version_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO clause_corpus_version (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    """Remove clause corpus version table."""
+    op.drop_table("clause_corpus_version")
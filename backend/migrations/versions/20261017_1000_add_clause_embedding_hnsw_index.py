@@ -0,0 +1,44 @@
+"""Add HNSW index on prohibited clause embeddings
+
+Revision ID: 49123bee18f1
+Revises: 012a40f6d69d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "49123bee18f1"
+down_revision: Union[str, None] = "012a40f6d69d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add HNSW cosine index so vector queries stop scanning the whole table."""
+    # Built concurrently so clause reads and the sync job are not blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_prohibited_clauses_embedding_hnsw",
+            "prohibited_clauses",
+            ["embedding"],
+            unique=False,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove HNSW index on prohibited clause embeddings."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_prohibited_clauses_embedding_hnsw",
+            table_name="prohibited_clauses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
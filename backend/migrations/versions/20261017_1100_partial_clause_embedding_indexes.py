@@ -0,0 +1,85 @@
+"""Replace clause embedding index with per-language partial indexes
+
+Revision ID: c8bf0e271ebd
+Revises: 49123bee18f1
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8bf0e271ebd"
+down_revision: Union[str, None] = "49123bee18f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CLAUSE_LANGUAGES = ("pl", "en")
+
+
+def upgrade() -> None:
+    """Index active shared clauses per language and custom clauses per user."""
+    # Built concurrently so clause reads and the sync job are not blocked
+    with op.get_context().autocommit_block():
+        for language in CLAUSE_LANGUAGES:
+            op.create_index(
+                f"ix_prohibited_clauses_embedding_hnsw_{language}",
+                "prohibited_clauses",
+                ["embedding"],
+                unique=False,
+                postgresql_using="hnsw",
+                postgresql_with={"m": 16, "ef_construction": 64},
+                postgresql_ops={"embedding": "vector_cosine_ops"},
+                postgresql_where=sa.text(
+                    "is_active AND embedding IS NOT NULL AND user_id IS NULL "
+                    f"AND language = '{language}'"
+                ),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            "ix_prohibited_clauses_user_language_active",
+            "prohibited_clauses",
+            ["user_id", "language"],
+            unique=False,
+            postgresql_where=sa.text("is_active AND embedding IS NOT NULL AND user_id IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_prohibited_clauses_embedding_hnsw",
+            table_name="prohibited_clauses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the single HNSW index over all clause embeddings."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_prohibited_clauses_embedding_hnsw",
+            "prohibited_clauses",
+            ["embedding"],
+            unique=False,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_prohibited_clauses_user_language_active",
+            table_name="prohibited_clauses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for language in CLAUSE_LANGUAGES:
+            op.drop_index(
+                f"ix_prohibited_clauses_embedding_hnsw_{language}",
+                table_name="prohibited_clauses",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,40 @@
+"""Add index on document sha256 hash
+
+Revision ID: 8450699c072e
+Revises: c8bf0e271ebd
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8450699c072e"
+down_revision: Union[str, None] = "c8bf0e271ebd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index documents by content hash to find analyses of identical files."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_documents_sha256_hash"),
+            "documents",
+            ["sha256_hash"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove document content hash index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_documents_sha256_hash"),
+            table_name="documents",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
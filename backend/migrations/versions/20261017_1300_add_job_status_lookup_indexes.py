@@ -0,0 +1,54 @@
+"""Add indexes for job status lookups
+
+Revision ID: 5d2e7f3a9b41
+Revises: 8450699c072e
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e7f3a9b41"
+down_revision: Union[str, None] = "8450699c072e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index documents by Celery task ID and analyses by document and creation time."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_documents_celery_task_id"),
+            "documents",
+            ["celery_task_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_analyses_document_id_created_at",
+            "analyses",
+            ["document_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove job status lookup indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_analyses_document_id_created_at",
+            table_name="analyses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_documents_celery_task_id"),
+            table_name="documents",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,31 @@
+"""Add per-page OCR report to document metadata
+
+Revision ID: 3b9c6e1f2a57
+Revises: 5d2e7f3a9b41
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9c6e1f2a57"
+down_revision: Union[str, None] = "5d2e7f3a9b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store how each scanned page was OCR-ed (fast pass or escalated)."""
+    op.add_column(
+        "document_metadata",
+        sa.Column("ocr_pages", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Remove per-page OCR report."""
+    op.drop_column("document_metadata", "ocr_pages")
@@ -1,6 +1,12 @@
 """Database models."""
 from models.analysis import Analysis, FlaggedClause
-from models.clause import ClauseCategory, ClauseLegalReference, LegalReference, ProhibitedClause
+from models.clause import (
+    ClauseCategory,
+    ClauseCorpusVersion,
+    ClauseLegalReference,
+    LegalReference,
+    ProhibitedClause,
+)
 from models.document import Document, DocumentMetadata
 from models.user import User
 
@@ -12,6 +18,7 @@ __all__ = [
     "LegalReference",
     "ProhibitedClause",
     "ClauseLegalReference",
+    "ClauseCorpusVersion",
     "Analysis",
     "FlaggedClause",
 ]
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, CheckConstraint, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, CheckConstraint, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -71,6 +71,8 @@ class Analysis(Base):
         CheckConstraint(
             "risk_score IS NULL OR (risk_score >= 0 AND risk_score <= 100)", name="valid_risk_score"
         ),
+        # Latest analysis of a document
+        Index("ix_analyses_document_id_created_at", "document_id", "created_at"),
     )
 
     def __repr__(self) -> str:
@@ -4,14 +4,33 @@ from typing import List, Optional
 from uuid import UUID, uuid4
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Boolean, CheckConstraint, Date, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    CheckConstraint,
+    Date,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from database.connection import Base
 
+# Clause languages with a dedicated partial vector index
+CLAUSE_LANGUAGES = ("pl", "en")
+
+
+def clause_embedding_index_name(language: str) -> str:
+    """Get the name of the partial HNSW index over shared clauses of a language."""
+    return f"ix_prohibited_clauses_embedding_hnsw_{language}"
+
 
 class ClauseCategory(Base):
     """Category/taxonomy for prohibited clauses."""
@@ -153,6 +172,28 @@ class ProhibitedClause(Base):
             "source IN ('standard', 'user', 'community', 'imported')", name="valid_clause_source"
         ),
         CheckConstraint("confidence >= 0.0 AND confidence <= 1.0", name="valid_clause_confidence"),
+        # One HNSW index per language over the active shared (non-custom) corpus
+        *(
+            Index(
+                clause_embedding_index_name(language),
+                "embedding",
+                postgresql_using="hnsw",
+                postgresql_with={"m": 16, "ef_construction": 64},
+                postgresql_ops={"embedding": "vector_cosine_ops"},
+                postgresql_where=text(
+                    "is_active AND embedding IS NOT NULL AND user_id IS NULL "
+                    f"AND language = '{language}'"
+                ),
+            )
+            for language in CLAUSE_LANGUAGES
+        ),
+        # Users' custom clauses are few per user and scanned exactly
+        Index(
+            "ix_prohibited_clauses_user_language_active",
+            "user_id",
+            "language",
+            postgresql_where=text("is_active AND embedding IS NOT NULL AND user_id IS NOT NULL"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -192,3 +233,24 @@ class ClauseLegalReference(Base):
 
     def __repr__(self) -> str:
         return f"<ClauseLegalReference(clause_id={self.clause_id}, legal_reference_id={self.legal_reference_id})>"
+
+
+class ClauseCorpusVersion(Base):
+    """Monotonic version of the prohibited clause corpus (single row).
+
+    Bumped by every job that changes clauses so that processes caching clause
+    embeddings can detect a stale copy with one primary-key lookup.
+    """
+
+    __tablename__ = "clause_corpus_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (CheckConstraint("id = 1", name="single_corpus_version_row"),)
+
+    def __repr__(self) -> str:
+        return f"<ClauseCorpusVersion(version={self.version})>"
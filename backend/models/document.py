@@ -54,10 +54,10 @@ class Document(Base):
     ocr_confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Checksums
-    sha256_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    sha256_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
 
     # Celery task tracking
-    celery_task_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    celery_task_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
@@ -131,6 +131,9 @@ class DocumentMetadata(Base):
     sections: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     paragraphs: Mapped[Optional[int]] = mapped_column(nullable=True)
 
+    # Per-page OCR report of scanned pages: dpi, preprocessed, escalated, confidence
+    ocr_pages: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+
     # Timestamp
     created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
 
@@ -4,7 +4,10 @@ from .metrics import (
     instrumentator,
     record_analysis_duration,
     record_document_upload,
+    record_embedding_cache,
+    record_ocr_pages,
     record_visitor_session,
+    record_worker_warmup,
     update_active_users,
 )
 
@@ -13,6 +16,9 @@ __all__ = [
     "record_visitor_session",
     "record_document_upload",
     "record_analysis_duration",
+    "record_embedding_cache",
+    "record_ocr_pages",
+    "record_worker_warmup",
     "update_active_users",
     "AnalysisTimer",
 ]
@@ -44,6 +44,28 @@ analysis_duration_seconds = Histogram(
     buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
 )
 
+# Custom metric: Segment embedding cache lookups
+embedding_cache_requests_total = Counter(
+    "embedding_cache_requests_total",
+    "Segment embedding cache lookups",
+    labelnames=("tier", "result"),  # tier: local, redis | result: hit, miss
+)
+
+# Custom metric: Celery worker process warm-up
+worker_warmup_duration_seconds = Histogram(
+    "worker_warmup_duration_seconds",
+    "Time spent warming up a Celery worker process",
+    labelnames=("stage",),  # model, encode, database, clause_index, total
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+# Custom metric: OCR-ed pages by pipeline path
+ocr_pages_total = Counter(
+    "ocr_pages_total",
+    "Pages and images OCR-ed, by pipeline path",
+    labelnames=("path",),  # fast, escalated, full
+)
+
 # Custom metric: Active users
 active_users_gauge = Gauge(
     "active_users_total",
@@ -97,6 +119,23 @@ def record_analysis_duration(analysis_type: str, duration: float):
     analysis_duration_seconds.labels(analysis_type=analysis_type).observe(duration)
 
 
+def record_embedding_cache(tier: str, result: str, count: int = 1):
+    """Record segment embedding cache hits or misses."""
+    if count:
+        embedding_cache_requests_total.labels(tier=tier, result=result).inc(count)
+
+
+def record_worker_warmup(stage: str, duration: float):
+    """Record the duration of a worker warm-up stage."""
+    worker_warmup_duration_seconds.labels(stage=stage).observe(duration)
+
+
+def record_ocr_pages(path: str, count: int = 1):
+    """Record pages OCR-ed on the fast, escalated or full path."""
+    if count:
+        ocr_pages_total.labels(path=path).inc(count)
+
+
 def update_active_users(time_window: str, count: int):
     """Update active users count."""
     active_users_gauge.labels(time_window=time_window).set(count)
@@ -28,6 +28,7 @@ class DocumentUploadResponse(BaseModel):
     pages: Optional[int] = None
     upload_url: str
     created_at: datetime
+    analysis_id: Optional[UUID] = None  # Set when the analysis of an identical file was reused
 
     class Config:
         """Pydantic config."""
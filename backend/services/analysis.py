@@ -1,29 +1,85 @@
 """Clause analysis service for detecting prohibited clauses in documents."""
 import re
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
 from uuid import UUID
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from sqlalchemy import select
-from sqlalchemy import text as sql_text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.clause import ClauseLegalReference, LegalReference, ProhibitedClause
+from services.clause_index import (
+    EMBEDDING_DIMENSION,
+    MODEL_NAME,
+    current_clause_index,
+    embedding_model_id,
+    get_clause_index,
+)
+from services.embedding_cache import get_embedding_cache, normalize_text
+from services.embedding_service import EmbeddingServiceClient
+from services.keyword_scoring import ClauseTokenCache, build_vocabulary, encode_text, jaccard_scores
+from services.vector_index import search_clause_embeddings
+
+_embedding_model: Optional[Union[SentenceTransformer, EmbeddingServiceClient]] = None
+
+
+def load_embedding_model(backend: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load the embedding model into this process.
+
+    The runtime is ANALYSIS_EMBEDDING_BACKEND unless given: "torch" (PyTorch),
+    "onnx" (ONNX Runtime) or "onnx-int8" (ONNX Runtime with the INT8 dynamically
+    quantized model file).
+    """
+    from config import settings
+
+    backend = backend or settings.analysis_embedding_backend
+    if backend == "torch":
+        return SentenceTransformer(MODEL_NAME)
+    if backend == "onnx":
+        return SentenceTransformer(MODEL_NAME, backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(
+            MODEL_NAME,
+            backend="onnx",
+            model_kwargs={"file_name": settings.analysis_embedding_onnx_int8_file},
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
 
-# Embedding model (same as used for import)
-MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-_embedding_model: Optional[SentenceTransformer] = None
 
+def get_embedding_model() -> Union[SentenceTransformer, EmbeddingServiceClient]:
+    """
+    Get or initialize the embedding model (lazy loading).
 
-def get_embedding_model() -> SentenceTransformer:
-    """Get or initialize the embedding model (lazy loading)."""
+    With EMBEDDING_SERVICE_ADDRESS set this is a client of the shared embedding
+    service, which has the same encode() interface, instead of a local model.
+    """
     global _embedding_model
     if _embedding_model is None:
-        _embedding_model = SentenceTransformer(MODEL_NAME)
+        from config import settings
+
+        if settings.embedding_service_address:
+            _embedding_model = EmbeddingServiceClient(settings.embedding_service_address)
+        else:
+            _embedding_model = load_embedding_model()
     return _embedding_model
 
 
+@dataclass
+class ClauseDetails:
+    """Prohibited clause fields and legal references needed to report a match."""
+
+    id: UUID
+    clause_text: str
+    risk_level: str
+    category_id: Optional[UUID] = None
+    notes: Optional[str] = None
+    tags: Optional[List[str]] = None
+    legal_references: List[dict] = field(default_factory=list)
+
+
 @dataclass
 class ClauseMatch:
     """Represents a match between document text and a prohibited clause."""
@@ -74,6 +130,18 @@ class ClauseAnalysisService:
         self.VECTOR_THRESHOLD_MEDIUM = settings.analysis_threshold_medium
         self.VECTOR_THRESHOLD_HIGH = settings.analysis_threshold_high
 
+        # Number of segments encoded together in one forward pass
+        self.embedding_batch_size = settings.analysis_embedding_batch_size
+
+        # Embeddings of previously seen (normalized) segment texts
+        self.embedding_cache = get_embedding_cache(embedding_model_id())
+
+        # Where nearest-neighbour search runs: "pgvector" or "memory"
+        self.vector_backend = settings.analysis_vector_backend
+
+        # Keyword token sets of clauses not served by the in-process index
+        self.clause_token_cache = ClauseTokenCache(settings.analysis_clause_token_cache_size)
+
     def segment_text(self, text: str) -> List[tuple[str, int, int]]:
         """
         Split document text into analyzable segments.
@@ -119,167 +187,261 @@ class ClauseAnalysisService:
 
         return final_segments
 
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding vector for text."""
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for many texts using batched model calls.
 
-    async def find_similar_clauses(
+        Texts are whitespace-normalized and looked up in the embedding cache first;
+        only distinct uncached texts are encoded, and their vectors are cached.
+
+        Returns a (len(texts), EMBEDDING_DIMENSION) float32 matrix, one row per text.
+        """
+        embeddings = np.empty((len(texts), EMBEDDING_DIMENSION), dtype=np.float32)
+        if not texts:
+            return embeddings
+
+        normalized = [normalize_text(text) for text in texts]
+        keys = [self.embedding_cache.key(text) for text in normalized]
+        cached = self.embedding_cache.get_many(keys)
+
+        # Distinct uncached texts, in first-seen order
+        missing: Dict[str, str] = {}
+        for key, text, embedding in zip(keys, normalized, cached):
+            if embedding is None:
+                missing.setdefault(key, text)
+
+        computed: Dict[str, np.ndarray] = {}
+        if missing:
+            encoded = self.model.encode(
+                list(missing.values()),
+                batch_size=self.embedding_batch_size,
+                convert_to_numpy=True,
+            )
+            computed = dict(zip(missing, np.asarray(encoded, dtype=np.float32)))
+            self.embedding_cache.set_many(computed)
+
+        for row, (key, embedding) in enumerate(zip(keys, cached)):
+            embeddings[row] = embedding if embedding is not None else computed[key]
+        return embeddings
+
+    async def find_similar_clauses_batch(
         self,
         session: AsyncSession,
-        text: str,
+        embeddings: np.ndarray,
         threshold: float = 0.65,
         limit: int = 5,
-    ) -> List[tuple[ProhibitedClause, float]]:
+        clause_cache: Optional[Dict[UUID, ClauseDetails]] = None,
+        language: Optional[str] = None,
+        user_id: Optional[UUID] = None,
+    ) -> List[List[tuple[ClauseDetails, float]]]:
         """
-        Find prohibited clauses similar to the given text using vector similarity.
+        Find prohibited clauses similar to many embeddings at once.
 
-        Returns list of (clause, similarity_score) tuples.
-        """
-        # Generate embedding for query text
-        query_embedding = self.generate_embedding(text)
-
-        # Format embedding for PostgreSQL
-        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-
-        # Use pgvector cosine distance (1 - cosine_similarity)
-        # Lower distance = higher similarity
-        query = f"""
-            SELECT
-                pc.id,
-                pc.clause_text,
-                pc.normalized_text,
-                pc.risk_level,
-                pc.notes,
-                pc.tags,
-                pc.category_id,
-                1 - (pc.embedding <=> '{embedding_str}'::vector) as similarity
-            FROM prohibited_clauses pc
-            WHERE pc.is_active = true
-            AND pc.embedding IS NOT NULL
-            AND 1 - (pc.embedding <=> '{embedding_str}'::vector) >= :threshold
-            ORDER BY pc.embedding <=> '{embedding_str}'::vector
-            LIMIT :limit
+        Candidates are the active shared clauses in the given language plus the
+        custom clauses of user_id (all languages when language is None, no custom
+        clauses when user_id is None). They come from the configured vector
+        backend: a single pgvector query or the in-process ClauseEmbeddingIndex.
+        Clause details for all hits are then loaded with one more query (or taken
+        from clause_cache when the same clause was already seen in this run).
+
+        Returns one list of (clause, similarity_score) tuples per embedding row,
+        in the same order as the input rows.
         """
+        matches: List[List[tuple[ClauseDetails, float]]] = [[] for _ in range(len(embeddings))]
+        if len(embeddings) == 0:
+            return matches
+
+        if self.vector_backend == "memory":
+            index = await get_clause_index(session)
+            hits = index.search(
+                embeddings, threshold=threshold, limit=limit, language=language, user_id=user_id
+            )
+        else:
+            hits = await search_clause_embeddings(
+                session, embeddings, threshold, limit, language=language, user_id=user_id
+            )
 
-        result = await session.execute(sql_text(query), {"threshold": threshold, "limit": limit})
+        # Load details for every candidate clause at once
+        clause_cache = await self.load_clause_details(
+            session, {clause_id for _, clause_id, _ in hits}, cache=clause_cache
+        )
 
-        matches = []
-        for row in result.fetchall():
-            # Fetch full clause object
-            clause_result = await session.execute(
-                select(ProhibitedClause).where(ProhibitedClause.id == row[0])
-            )
-            clause = clause_result.scalar_one_or_none()
+        for row, clause_id, similarity in hits:
+            clause = clause_cache.get(clause_id)
             if clause:
-                matches.append((clause, row[7]))  # clause, similarity
+                matches[row].append((clause, similarity))
 
         return matches
 
-    async def get_legal_references(self, session: AsyncSession, clause_id: UUID) -> List[dict]:
-        """Get legal references for a clause."""
-        result = await session.execute(
-            select(LegalReference)
-            .join(ClauseLegalReference)
-            .where(ClauseLegalReference.clause_id == clause_id)
-        )
-        references = result.scalars().all()
-
-        return [
-            {
-                "article_code": ref.article_code,
-                "article_title": ref.article_title,
-                "law_name": ref.law_name,
-                "description": ref.description,
-            }
-            for ref in references
-        ]
-
-    def keyword_match(self, text: str, clause_text: str) -> float:
+    async def load_clause_details(
+        self,
+        session: AsyncSession,
+        clause_ids: Iterable[UUID],
+        cache: Optional[Dict[UUID, ClauseDetails]] = None,
+    ) -> Dict[UUID, ClauseDetails]:
         """
-        Calculate keyword match score using Jaccard similarity.
+        Load clauses and their legal references for many clause IDs in one query.
 
-        Returns score between 0 and 1.
+        Clauses already present in the cache are not fetched again; newly loaded
+        clauses are added to it. Returns the (updated) cache.
         """
-        # Normalize texts
-        text_words = set(re.findall(r"\w+", text.lower()))
-        clause_words = set(re.findall(r"\w+", clause_text.lower()))
+        if cache is None:
+            cache = {}
 
-        if not text_words or not clause_words:
-            return 0.0
+        missing_ids = {clause_id for clause_id in clause_ids if clause_id not in cache}
+        if not missing_ids:
+            return cache
 
-        # Calculate Jaccard similarity
-        intersection = len(text_words & clause_words)
-        union = len(text_words | clause_words)
+        result = await session.execute(
+            select(
+                ProhibitedClause.id,
+                ProhibitedClause.clause_text,
+                ProhibitedClause.risk_level,
+                ProhibitedClause.category_id,
+                ProhibitedClause.notes,
+                ProhibitedClause.tags,
+                LegalReference,
+            )
+            .outerjoin(ClauseLegalReference, ClauseLegalReference.clause_id == ProhibitedClause.id)
+            .outerjoin(LegalReference, LegalReference.id == ClauseLegalReference.legal_reference_id)
+            .where(ProhibitedClause.id.in_(missing_ids))
+        )
 
-        return intersection / union if union > 0 else 0.0
+        for clause_id, clause_text, risk_level, category_id, notes, tags, reference in result:
+            details = cache.get(clause_id)
+            if details is None:
+                details = ClauseDetails(
+                    id=clause_id,
+                    clause_text=clause_text,
+                    risk_level=risk_level,
+                    category_id=category_id,
+                    notes=notes,
+                    tags=tags,
+                )
+                cache[clause_id] = details
+            if reference is not None:
+                details.legal_references.append(self._legal_reference_to_dict(reference))
+
+        return cache
+
+    @staticmethod
+    def _legal_reference_to_dict(ref: LegalReference) -> dict:
+        """Serialize a legal reference for match explanations."""
+        return {
+            "article_code": ref.article_code,
+            "article_title": ref.article_title,
+            "law_name": ref.law_name,
+            "description": ref.description,
+        }
+
+    def clause_token_ids(
+        self, clauses: Dict[UUID, ClauseDetails]
+    ) -> tuple[Dict[str, int], Dict[UUID, np.ndarray]]:
+        """
+        Get a keyword vocabulary and the token-ID sets of clauses.
 
-    async def analyze_segment(
-        self,
-        session: AsyncSession,
-        segment_text: str,
-        start_position: int,
-        end_position: int,
-    ) -> List[ClauseMatch]:
+        With the memory vector backend these are the precomputed sets of the
+        in-process ClauseEmbeddingIndex. Otherwise (or for clauses missing from
+        the index) the cached token sets of the clauses are numbered in a
+        vocabulary local to the call.
         """
-        Analyze a single text segment against the clause database.
+        index = current_clause_index() if self.vector_backend == "memory" else None
+        if index is not None:
+            token_ids = {clause_id: index.clause_token_ids(clause_id) for clause_id in clauses}
+            if all(ids is not None for ids in token_ids.values()):
+                return index.token_lookup, token_ids
+
+        vocabulary, token_ids = build_vocabulary(
+            self.clause_token_cache.get(clause_id, clause.clause_text)
+            for clause_id, clause in clauses.items()
+        )
+        return vocabulary, dict(zip(clauses, token_ids))
 
-        Returns list of ClauseMatch objects.
+    def score_matches(
+        self,
+        segments: List[tuple[str, int, int]],
+        similar_clauses_per_segment: List[List[tuple[ClauseDetails, float]]],
+    ) -> List[List[ClauseMatch]]:
         """
-        matches = []
+        Apply hybrid scoring and risk classification to the vector hits of many segments.
 
-        # Vector similarity search
-        similar_clauses = await self.find_similar_clauses(
-            session,
-            segment_text,
-            threshold=self.VECTOR_THRESHOLD_LOW,
-            limit=3,
-        )
+        Keyword (Jaccard) scores of all (segment, clause) pairs are computed in one
+        batch over precomputed token-ID sets, and the hybrid weighting, threshold
+        and classification are applied as array operations.
 
-        for clause, vector_score in similar_clauses:
-            # Also calculate keyword similarity for hybrid scoring
-            keyword_score = self.keyword_match(segment_text, clause.clause_text)
+        Returns one list of ClauseMatch objects per segment.
+        """
+        matches: List[List[ClauseMatch]] = [[] for _ in segments]
 
-            # Hybrid score: weighted average
-            hybrid_score = (vector_score * 0.7) + (keyword_score * 0.3)
+        pairs = [
+            (segment_index, clause, vector_score)
+            for segment_index, similar_clauses in enumerate(similar_clauses_per_segment)
+            for clause, vector_score in similar_clauses
+        ]
+        if not pairs:
+            return matches
 
-            # Skip matches below the minimum threshold (VECTOR_THRESHOLD_LOW = 80%)
-            if hybrid_score < self.VECTOR_THRESHOLD_LOW:
-                continue
+        # Also calculate keyword similarity for hybrid scoring
+        vocabulary, clause_tokens = self.clause_token_ids(
+            {clause.id: clause for _, clause, _ in pairs}
+        )
+        segment_tokens = {
+            segment_index: encode_text(segments[segment_index][0], vocabulary)
+            for segment_index, _, _ in pairs
+        }
+        keyword_scores = jaccard_scores(
+            [segment_tokens[segment_index][0] for segment_index, _, _ in pairs],
+            [clause_tokens[clause.id] for _, clause, _ in pairs],
+            left_sizes=np.fromiter(
+                (segment_tokens[segment_index][1] for segment_index, _, _ in pairs),
+                dtype=np.int64,
+                count=len(pairs),
+            ),
+        )
+        vector_scores = np.fromiter((score for _, _, score in pairs), dtype=np.float64)
+
+        # Hybrid score: weighted average
+        hybrid_scores = (vector_scores * 0.7) + (keyword_scores * 0.3)
+
+        # Determine risk level based on similarity score, not clause's original risk
+        risk_levels = np.select(
+            [
+                hybrid_scores >= self.VECTOR_THRESHOLD_HIGH,
+                hybrid_scores >= self.VECTOR_THRESHOLD_MEDIUM,
+            ],
+            ["high", "medium"],
+            default="low",
+        )
 
-            # Determine risk level based on similarity score, not clause's original risk
-            if hybrid_score >= self.VECTOR_THRESHOLD_HIGH:
-                risk_level = "high"
-            elif hybrid_score >= self.VECTOR_THRESHOLD_MEDIUM:
-                risk_level = "medium"
-            else:
-                risk_level = "low"
+        # Determine match type based on which method contributed more
+        match_types = np.select(
+            [
+                (vector_scores > 0.8) & (keyword_scores > 0.3),
+                vector_scores > keyword_scores,
+            ],
+            ["hybrid", "vector"],
+            default="keyword",
+        )
 
-            # Determine match type based on which method contributed more
-            if vector_score > 0.8 and keyword_score > 0.3:
-                match_type = "hybrid"
-            elif vector_score > keyword_score:
-                match_type = "vector"
-            else:
-                match_type = "keyword"
-
-            # Get legal references
-            legal_refs = await self.get_legal_references(session, clause.id)
-
-            match = ClauseMatch(
-                clause_id=clause.id,
-                clause_text=clause.clause_text,
-                matched_text=segment_text,
-                similarity_score=hybrid_score,
-                match_type=match_type,
-                risk_level=risk_level,
-                start_position=start_position,
-                end_position=end_position,
-                legal_references=legal_refs,
-                notes=clause.notes,
-                tags=clause.tags,
+        # Skip matches below the minimum threshold (VECTOR_THRESHOLD_LOW = 80%)
+        for pair_index in np.flatnonzero(hybrid_scores >= self.VECTOR_THRESHOLD_LOW):
+            segment_index, clause, _ = pairs[pair_index]
+            segment_text, start_position, end_position = segments[segment_index]
+            matches[segment_index].append(
+                ClauseMatch(
+                    clause_id=clause.id,
+                    clause_text=clause.clause_text,
+                    matched_text=segment_text,
+                    similarity_score=float(hybrid_scores[pair_index]),
+                    match_type=str(match_types[pair_index]),
+                    risk_level=str(risk_levels[pair_index]),
+                    start_position=start_position,
+                    end_position=end_position,
+                    legal_references=list(clause.legal_references),
+                    notes=clause.notes,
+                    tags=clause.tags,
+                )
             )
-            matches.append(match)
 
         return matches
 
@@ -288,6 +450,7 @@ class ClauseAnalysisService:
         session: AsyncSession,
         document_text: str,
         language: str = "pl",
+        user_id: Optional[UUID] = None,
     ) -> AnalysisResult:
         """
         Analyze entire document for prohibited clauses.
@@ -296,6 +459,7 @@ class ClauseAnalysisService:
             session: Database session
             document_text: Full text of the document
             language: Document language (pl or en)
+            user_id: Document owner, whose custom clauses are matched as well
 
         Returns:
             AnalysisResult with all matches and statistics
@@ -303,12 +467,27 @@ class ClauseAnalysisService:
         # Segment the document
         segments = self.segment_text(document_text)
 
+        # Encode all segments up front in batched model calls
+        embeddings = self.generate_embeddings([segment[0] for segment in segments])
+
+        # Clause details are loaded once per clause for the whole analysis run
+        clause_cache: Dict[UUID, ClauseDetails] = {}
+
+        # Match all segments against the clause database in one query
+        similar_clauses_per_segment = await self.find_similar_clauses_batch(
+            session,
+            embeddings,
+            threshold=self.VECTOR_THRESHOLD_LOW,
+            limit=3,
+            clause_cache=clause_cache,
+            language=language,
+            user_id=user_id,
+        )
+
         all_matches: List[ClauseMatch] = []
         seen_clause_ids = set()
 
-        for segment_text, start, end in segments:
-            segment_matches = await self.analyze_segment(session, segment_text, start, end)
-
+        for segment_matches in self.score_matches(segments, similar_clauses_per_segment):
             # Deduplicate matches (same clause matched in similar segments)
             for match in segment_matches:
                 if match.clause_id not in seen_clause_ids:
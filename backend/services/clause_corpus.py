@@ -0,0 +1,44 @@
+"""Prohibited clause corpus versioning for cache invalidation."""
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from models.clause import ClauseCorpusVersion
+
+
+async def get_corpus_version(session: AsyncSession) -> int:
+    """
+    Get the current clause corpus version.
+
+    Returns 0 when the corpus has never been versioned.
+    """
+    result = await session.execute(
+        select(ClauseCorpusVersion.version).where(ClauseCorpusVersion.id == 1)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_corpus_version(session: AsyncSession) -> int:
+    """
+    Increment the clause corpus version after clauses were added or changed.
+
+    Runs in the caller's transaction, so the new version becomes visible together
+    with the clause changes on commit.
+
+    Returns the new version.
+    """
+    statement = (
+        insert(ClauseCorpusVersion)
+        .values(id=1, version=1)
+        .on_conflict_do_update(
+            index_elements=[ClauseCorpusVersion.id],
+            set_={
+                "version": ClauseCorpusVersion.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+        .returning(ClauseCorpusVersion.version)
+    )
+    result = await session.execute(statement)
+    return result.scalar_one()
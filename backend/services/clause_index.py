@@ -0,0 +1,374 @@
+"""In-process clause embedding index with memory-mapped on-disk snapshots."""
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.clause import ProhibitedClause
+from services.clause_corpus import get_corpus_version
+
+logger = logging.getLogger(__name__)
+
+# Embedding model of the stored clause embeddings (same as used for import)
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_DIMENSION = 384
+
+SNAPSHOT_PREFIX = "clause-index-v"
+
+# Bumped when the snapshot file layout changes, so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 3
+
+
+def embedding_model_id() -> str:
+    """Identify the model and runtime producing embeddings (for cache keys)."""
+    return f"{MODEL_NAME}@{settings.analysis_embedding_backend}"
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text into the lowercase word set used for keyword matching."""
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize matrix rows (zero rows are left as zeros)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ClauseEmbeddingIndex:
+    """
+    In-process exact cosine index over prohibited clause embeddings.
+
+    Holds a contiguous float32 matrix of L2-normalized embeddings (one row per
+    active clause) and the matching clause IDs, so a whole document is matched
+    with a single (segments x dim) @ (dim x clauses) product. The clause corpus
+    version it was built from is kept to detect staleness.
+
+    Next to the embeddings the index keeps each clause's language, owner (16
+    zero bytes for shared clauses, else the custom clause's user_id) and keyword
+    token set for hybrid scoring (as vocabulary IDs in CSR layout:
+    token_ids[token_offsets[i]:token_offsets[i + 1]]). All arrays can be written
+    to a snapshot directory and reopened with numpy memory mapping, so Celery
+    prefork children share a single page-cache copy instead of each building a
+    private one.
+    """
+
+    def __init__(
+        self,
+        id_bytes: np.ndarray,
+        embeddings: np.ndarray,
+        languages: np.ndarray,
+        owner_bytes: np.ndarray,
+        token_ids: np.ndarray,
+        token_offsets: np.ndarray,
+        vocabulary: List[str],
+        version: int = 0,
+    ) -> None:
+        """Wrap prepared index arrays (embeddings must already be normalized)."""
+        self.id_bytes = id_bytes
+        self.embeddings = embeddings
+        self.languages = languages
+        self.owner_bytes = owner_bytes
+        self.token_ids = token_ids
+        self.token_offsets = token_offsets
+        self.vocabulary = vocabulary
+        self.version = version
+
+        # Vocabulary ID of each token, for looking up document tokens
+        self.token_lookup = {token: token_id for token_id, token in enumerate(vocabulary)}
+        self._rows: Optional[Dict[UUID, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.id_bytes)
+
+    @classmethod
+    def build(
+        cls,
+        clause_ids: List[UUID],
+        embeddings: np.ndarray,
+        clause_texts: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        user_ids: Optional[List[Optional[UUID]]] = None,
+        version: int = 0,
+    ) -> "ClauseEmbeddingIndex":
+        """Build the index from clause IDs, (unnormalized) embeddings and clause data."""
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIMENSION)
+        id_bytes = np.frombuffer(b"".join(cid.bytes for cid in clause_ids), dtype=np.uint8)
+        owner_bytes = np.frombuffer(
+            b"".join(
+                user_id.bytes if user_id else bytes(16)
+                for user_id in user_ids or [None] * len(clause_ids)
+            ),
+            dtype=np.uint8,
+        )
+
+        vocabulary: Dict[str, int] = {}
+        token_ids: List[int] = []
+        token_offsets = [0]
+        for text in clause_texts or [""] * len(clause_ids):
+            for token in sorted(tokenize(text)):
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            token_offsets.append(len(token_ids))
+
+        return cls(
+            id_bytes=id_bytes.reshape(-1, 16),
+            embeddings=np.ascontiguousarray(_normalize_rows(matrix)),
+            languages=np.asarray(languages or ["pl"] * len(clause_ids), dtype="U10"),
+            owner_bytes=owner_bytes.reshape(-1, 16),
+            token_ids=np.asarray(token_ids, dtype=np.int32),
+            token_offsets=np.asarray(token_offsets, dtype=np.int64),
+            vocabulary=list(vocabulary),
+            version=version,
+        )
+
+    @classmethod
+    async def load(cls, session: AsyncSession) -> "ClauseEmbeddingIndex":
+        """Load embeddings and data of all active clauses from the database."""
+        version = await get_corpus_version(session)
+        result = await session.execute(
+            select(
+                ProhibitedClause.id,
+                ProhibitedClause.embedding,
+                ProhibitedClause.clause_text,
+                ProhibitedClause.language,
+                ProhibitedClause.user_id,
+            ).where(
+                ProhibitedClause.is_active.is_(True),
+                ProhibitedClause.embedding.isnot(None),
+            )
+        )
+        rows = result.all()
+
+        if rows:
+            embeddings = np.stack([np.asarray(row[1], dtype=np.float32) for row in rows])
+        else:
+            embeddings = np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+        return cls.build(
+            clause_ids=[row[0] for row in rows],
+            embeddings=embeddings,
+            clause_texts=[row[2] for row in rows],
+            languages=[row[3] for row in rows],
+            user_ids=[row[4] for row in rows],
+            version=version,
+        )
+
+    def clause_id(self, row: int) -> UUID:
+        """Get the clause ID stored at an index row."""
+        return UUID(bytes=self.id_bytes[row].tobytes())
+
+    def clause_token_ids(self, clause_id: UUID) -> Optional[np.ndarray]:
+        """Get the sorted keyword token IDs of a clause (None if it is not indexed)."""
+        if self._rows is None:
+            self._rows = {self.clause_id(row): row for row in range(len(self))}
+        row = self._rows.get(clause_id)
+        if row is None:
+            return None
+        return self.token_ids[self.token_offsets[row] : self.token_offsets[row + 1]]
+
+    def save_snapshot(self, path: Path) -> None:
+        """
+        Write the index to a snapshot directory.
+
+        Files are written to a temporary sibling directory first and renamed into
+        place, so readers never observe a partially written snapshot.
+        """
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        np.save(tmp_path / "ids.npy", self.id_bytes)
+        np.save(tmp_path / "embeddings.npy", self.embeddings)
+        np.save(tmp_path / "languages.npy", self.languages)
+        np.save(tmp_path / "owners.npy", self.owner_bytes)
+        np.save(tmp_path / "token_ids.npy", self.token_ids)
+        np.save(tmp_path / "token_offsets.npy", self.token_offsets)
+        (tmp_path / "manifest.json").write_text(
+            json.dumps({"version": self.version, "vocabulary": self.vocabulary})
+        )
+
+        try:
+            tmp_path.rename(path)
+        except OSError:
+            # Another process published the same version first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    @classmethod
+    def open_snapshot(cls, path: Path) -> "ClauseEmbeddingIndex":
+        """Open a snapshot directory with the large arrays memory-mapped read-only."""
+        manifest = json.loads((path / "manifest.json").read_text())
+        return cls(
+            id_bytes=np.load(path / "ids.npy", mmap_mode="r"),
+            embeddings=np.load(path / "embeddings.npy", mmap_mode="r"),
+            languages=np.load(path / "languages.npy"),
+            owner_bytes=np.load(path / "owners.npy", mmap_mode="r"),
+            token_ids=np.load(path / "token_ids.npy", mmap_mode="r"),
+            token_offsets=np.load(path / "token_offsets.npy", mmap_mode="r"),
+            vocabulary=manifest["vocabulary"],
+            version=manifest["version"],
+        )
+
+    def candidate_rows(
+        self, language: Optional[str] = None, user_id: Optional[UUID] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Get the index rows searched for a document language and user.
+
+        Candidates are the shared clauses plus the user's custom clauses, limited
+        to the language when one is given. Returns None when every row qualifies.
+        """
+        mask = ~self.owner_bytes.any(axis=1)
+        if user_id is not None:
+            owner = np.frombuffer(user_id.bytes, dtype=np.uint8)
+            mask |= (self.owner_bytes == owner).all(axis=1)
+        if language is not None:
+            mask &= self.languages == language
+        return None if mask.all() else np.flatnonzero(mask)
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        threshold: float,
+        limit: int,
+        language: Optional[str] = None,
+        user_id: Optional[UUID] = None,
+    ) -> List[tuple[int, UUID, float]]:
+        """
+        Find the top-k most similar clauses for every query embedding.
+
+        Mirrors the pgvector query: candidates restricted to the language and the
+        user's clause scope, top-k by cosine similarity first, then the threshold
+        filter.
+
+        Returns (row, clause_id, similarity) hits ordered by row, then similarity.
+        """
+        if len(self) == 0 or len(embeddings) == 0 or limit <= 0:
+            return []
+
+        rows = self.candidate_rows(language, user_id)
+        candidates = self.embeddings if rows is None else self.embeddings[rows]
+        if len(candidates) == 0:
+            return []
+
+        queries = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        scores = queries @ candidates.T
+
+        k = min(limit, len(candidates))
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(candidates)), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        # argpartition leaves the top-k unordered
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+
+        hits = []
+        for row in range(len(queries)):
+            for column, score in zip(top[row], top_scores[row]):
+                if score >= threshold:
+                    hits.append((row, self.clause_id(column), float(score)))
+        return hits
+
+
+def snapshot_path(version: int) -> Optional[Path]:
+    """Get the snapshot directory for a corpus version (None when disabled)."""
+    if not settings.analysis_index_snapshot_dir:
+        return None
+    return (
+        Path(settings.analysis_index_snapshot_dir)
+        / f"{SNAPSHOT_PREFIX}{version}.f{SNAPSHOT_FORMAT}"
+    )
+
+
+def _remove_stale_snapshots(keep: Iterable[Path]) -> None:
+    """
+    Delete snapshots of other corpus versions (open memory maps stay valid).
+
+    Must be called with the snapshot lock held exclusively, so no process is
+    between finding a snapshot and memory-mapping it.
+    """
+    keep_names = {path.name for path in keep}
+    for path in Path(settings.analysis_index_snapshot_dir).glob(f"{SNAPSHOT_PREFIX}*"):
+        if path.name not in keep_names:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+async def _load_or_build_snapshot(session: AsyncSession, version: int) -> ClauseEmbeddingIndex:
+    """Open the snapshot for a version, building it from the database if missing."""
+    path = snapshot_path(version)
+    if path is None:
+        return await ClauseEmbeddingIndex.load(session)
+
+    # POSIX only; imported here so workers without snapshots also run on Windows
+    import fcntl
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.parent / ".lock", "w") as lock_file:
+        # Readers hold the lock shared while opening a snapshot, so a stale
+        # snapshot is never removed between the existence check and np.load
+        await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_SH)
+        try:
+            if path.exists():
+                return ClauseEmbeddingIndex.open_snapshot(path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        # Only one process builds a version; the others wait and then open it
+        await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+        try:
+            if not path.exists():
+                index = await ClauseEmbeddingIndex.load(session)
+                path = snapshot_path(index.version)
+                index.save_snapshot(path)
+                _remove_stale_snapshots(keep=[path])
+                logger.info(f"Wrote clause index snapshot {path} ({len(index)} clauses)")
+            return ClauseEmbeddingIndex.open_snapshot(path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_clause_index: Optional[ClauseEmbeddingIndex] = None
+
+
+async def get_clause_index(session: AsyncSession) -> ClauseEmbeddingIndex:
+    """
+    Get the in-process clause embedding index, (re)loading it when stale.
+
+    The clause corpus version is checked on every call (a single primary-key
+    lookup); the index is only reloaded when the version has changed, e.g. after
+    the nightly clause sync. With ANALYSIS_INDEX_SNAPSHOT_DIR set, reloading
+    memory-maps the shared snapshot of that version instead of querying all
+    clause embeddings again.
+    """
+    global _clause_index
+    version = await get_corpus_version(session)
+    if _clause_index is None or _clause_index.version != version:
+        _clause_index = await _load_or_build_snapshot(session, version)
+    return _clause_index
+
+
+async def load_clause_index(session: AsyncSession) -> ClauseEmbeddingIndex:
+    """(Re)load the in-process clause embedding index for the current corpus version."""
+    global _clause_index
+    _clause_index = await _load_or_build_snapshot(session, await get_corpus_version(session))
+    return _clause_index
+
+
+def current_clause_index() -> Optional[ClauseEmbeddingIndex]:
+    """Get the index last loaded by this process, without checking its version."""
+    return _clause_index
@@ -0,0 +1,151 @@
+"""Content-addressed cache of segment embeddings (in-process LRU + Redis)."""
+import hashlib
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import redis
+
+from config import settings
+from monitoring.metrics import record_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for cached embeddings
+KEY_PREFIX = "embedding:"
+
+# Seconds to skip the Redis tier after a connection error
+REDIS_RETRY_SECONDS = 30.0
+
+
+def normalize_text(text: str) -> str:
+    """Normalize segment text for caching (Unicode NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache mapping normalized text to its float32 embedding.
+
+    Keys are the SHA-256 of model name and normalized text, so a model change
+    never returns stale vectors. The first tier is a per-process LRU bounded to
+    max_entries vectors; the second is Redis (shared by API and workers), where
+    entries expire after ttl seconds and are bounded by the cache instance's
+    maxmemory LRU eviction. Redis errors degrade to the local tier.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int,
+        redis_client: Optional[redis.Redis] = None,
+        ttl: int = 0,
+    ) -> None:
+        """Create a cache for one embedding model."""
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._local: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._redis_retry_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def key(self, text: str) -> str:
+        """Build the cache key for already normalized text."""
+        digest = hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}{digest}"
+
+    def _redis_available(self) -> bool:
+        return self.redis_client is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Embedding cache Redis tier unavailable: {error}")
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _store_local(self, key: str, embedding: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        self._local[key] = embedding
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for many keys (one Redis round-trip for local misses).
+
+        Returns one embedding or None per key, in the same order.
+        """
+        found: List[Optional[np.ndarray]] = []
+        for key in keys:
+            embedding = self._local.get(key)
+            if embedding is not None:
+                self._local.move_to_end(key)
+            found.append(embedding)
+
+        local_misses = [i for i, embedding in enumerate(found) if embedding is None]
+        record_embedding_cache("local", "hit", len(keys) - len(local_misses))
+        record_embedding_cache("local", "miss", len(local_misses))
+        if not local_misses or not self._redis_available():
+            return found
+
+        try:
+            values = self.redis_client.mget([keys[i] for i in local_misses])
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return found
+
+        redis_hits = 0
+        for i, value in zip(local_misses, values):
+            if value is None:
+                continue
+            embedding = np.frombuffer(value, dtype=np.float32)
+            found[i] = embedding
+            self._store_local(keys[i], embedding)
+            redis_hits += 1
+        record_embedding_cache("redis", "hit", redis_hits)
+        record_embedding_cache("redis", "miss", len(local_misses) - redis_hits)
+        return found
+
+    def set_many(self, embeddings: Dict[str, np.ndarray]) -> None:
+        """Store freshly computed embeddings in both tiers."""
+        for key, embedding in embeddings.items():
+            self._store_local(key, np.asarray(embedding, dtype=np.float32))
+
+        if not embeddings or self.ttl <= 0 or not self._redis_available():
+            return
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key, embedding in embeddings.items():
+                pipeline.set(key, np.asarray(embedding, dtype=np.float32).tobytes(), ex=self.ttl)
+            pipeline.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """Get or create the process-wide embedding cache configured from settings."""
+    global _embedding_cache
+    if _embedding_cache is None or _embedding_cache.model_name != model_name:
+        redis_client = None
+        if settings.analysis_embedding_cache_ttl > 0:
+            redis_client = redis.Redis.from_url(
+                settings.analysis_embedding_cache_redis_url,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        _embedding_cache = EmbeddingCache(
+            model_name=model_name,
+            max_entries=settings.analysis_embedding_cache_size,
+            redis_client=redis_client,
+            ttl=settings.analysis_embedding_cache_ttl,
+        )
+    return _embedding_cache
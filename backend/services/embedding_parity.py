@@ -0,0 +1,103 @@
+"""Parity check of alternative embedding backends against the PyTorch model.
+
+Run with ``python -m services.embedding_parity --backend onnx-int8``. Cosine
+similarities between all seeded clause texts are computed with PyTorch and with
+the candidate backend; the largest difference must stay within tolerance so the
+ANALYSIS_THRESHOLD_* values keep their meaning.
+"""
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+# Max allowed |cosine(torch) - cosine(candidate)|; thresholds are >= 0.06 apart
+PARITY_TOLERANCE = 0.01
+
+
+@dataclass
+class ParityReport:
+    """Differences between reference and candidate cosine similarity scores."""
+
+    text_count: int
+    max_score_delta: float
+    mean_score_delta: float
+    min_self_similarity: float
+    tolerance: float
+
+    @property
+    def passed(self) -> bool:
+        """Whether every score stayed within tolerance."""
+        return self.max_score_delta <= self.tolerance
+
+
+def _normalized(model, texts: List[str]) -> np.ndarray:
+    embeddings = np.asarray(model.encode(texts, convert_to_numpy=True), dtype=np.float64)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def compare_embedding_models(
+    reference,
+    candidate,
+    texts: List[str],
+    tolerance: float = PARITY_TOLERANCE,
+) -> ParityReport:
+    """
+    Compare the pairwise cosine scores two models produce for the same texts.
+
+    Pairs of texts stand in for (segment, clause) pairs; the self similarity
+    between both models' vectors of a text is reported as well.
+    """
+    reference_embeddings = _normalized(reference, texts)
+    candidate_embeddings = _normalized(candidate, texts)
+
+    deltas = np.abs(
+        reference_embeddings @ reference_embeddings.T
+        - candidate_embeddings @ candidate_embeddings.T
+    )
+    self_similarity = np.sum(reference_embeddings * candidate_embeddings, axis=1)
+
+    return ParityReport(
+        text_count=len(texts),
+        max_score_delta=float(deltas.max()),
+        mean_score_delta=float(deltas.mean()),
+        min_self_similarity=float(self_similarity.min()),
+        tolerance=tolerance,
+    )
+
+
+def seeded_clause_texts() -> List[str]:
+    """Get the clause texts of the seeded clause corpus."""
+    from database.seed_clauses import PROHIBITED_CLAUSES
+
+    return [clause["clause_text"] for clause in PROHIBITED_CLAUSES]
+
+
+def main() -> None:
+    """Check a backend against PyTorch on the seeded clauses (exit code 1 on failure)."""
+    from services.analysis import load_embedding_model
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["onnx", "onnx-int8"], default="onnx-int8")
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE)
+    args = parser.parse_args()
+
+    report = compare_embedding_models(
+        load_embedding_model("torch"),
+        load_embedding_model(args.backend),
+        seeded_clause_texts(),
+        tolerance=args.tolerance,
+    )
+    print(
+        f"{args.backend}: {report.text_count} texts, "
+        f"max score delta {report.max_score_delta:.4f}, "
+        f"mean {report.mean_score_delta:.4f}, "
+        f"min self similarity {report.min_self_similarity:.4f} "
+        f"-> {'OK' if report.passed else 'FAILED'} (tolerance {report.tolerance})"
+    )
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
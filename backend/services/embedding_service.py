@@ -0,0 +1,297 @@
+"""Shared embedding service: one model instance with dynamic request batching.
+
+Run with ``python -m services.embedding_service``. Celery workers, the clause
+sync task and import scripts connect to it (EMBEDDING_SERVICE_ADDRESS) instead
+of each loading a private copy of the sentence transformer.
+
+Wire format: every message is a 4-byte big-endian length followed by the
+payload. A request payload is a UTF-8 JSON list of texts; a response payload is
+a status byte (0 = ok, 1 = error) followed by the row-major float32 embedding
+matrix, or by a UTF-8 error message.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import settings
+from services.clause_index import EMBEDDING_DIMENSION
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+_STATUS_OK = b"\x00"
+_STATUS_ERROR = b"\x01"
+
+
+class EmbeddingServiceError(RuntimeError):
+    """Raised when the embedding service cannot be reached or fails to encode."""
+
+
+def parse_address(address: str) -> Tuple[str, Union[str, Tuple[str, int]]]:
+    """
+    Parse a service address into (family, address).
+
+    Accepts ``unix:///path/to.sock`` and ``tcp://host:port``.
+    """
+    if address.startswith("unix://"):
+        return "unix", address[len("unix://") :]
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://") :].rpartition(":")
+        return "tcp", (host, int(port))
+    raise ValueError(f"Unsupported embedding service address: {address}")
+
+
+@dataclass
+class _EncodeRequest:
+    """Texts of one client request waiting to be batched."""
+
+    texts: List[str]
+    future: asyncio.Future = field(repr=False)
+
+
+class DynamicBatcher:
+    """
+    Merge concurrent encode requests into shared model batches.
+
+    A batch is dispatched once it holds max_batch texts or max_wait seconds after
+    its first request arrived, whichever comes first. Batches run one at a time
+    in a worker thread, so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, model, max_batch: int, max_wait: float) -> None:
+        """Create a batcher for a loaded model."""
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "asyncio.Queue[_EncodeRequest]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start dispatching batches on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop dispatching batches."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Queue texts for the next batch and wait for their embeddings."""
+        if not texts:
+            return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_EncodeRequest(texts, future))
+        return await future
+
+    async def _collect(self) -> List[_EncodeRequest]:
+        """Wait for a first request, then gather more until the batch is full or due."""
+        requests = [await self._queue.get()]
+        size = len(requests[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            requests.append(request)
+            size += len(request.texts)
+        return requests
+
+    async def _run(self) -> None:
+        while True:
+            requests = await self._collect()
+            texts = [text for request in requests for text in request.texts]
+            try:
+                embeddings = await asyncio.to_thread(
+                    self.model.encode,
+                    texts,
+                    batch_size=self.max_batch,
+                    convert_to_numpy=True,
+                )
+                embeddings = np.asarray(embeddings, dtype=np.float32)
+            except Exception as e:
+                logger.exception("Embedding batch failed")
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in requests:
+                rows = embeddings[offset : offset + len(request.texts)]
+                offset += len(request.texts)
+                if not request.future.done():
+                    request.future.set_result(rows)
+            logger.debug(f"Encoded batch of {len(texts)} texts from {len(requests)} requests")
+
+
+async def _read_message(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def _write_message(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+async def _handle_connection(
+    batcher: DynamicBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Serve encode requests of one client connection until it disconnects."""
+    try:
+        while True:
+            try:
+                payload = await _read_message(reader)
+            except asyncio.IncompleteReadError:
+                break
+            try:
+                embeddings = await batcher.encode(json.loads(payload))
+                response = _STATUS_OK + np.ascontiguousarray(embeddings).tobytes()
+            except Exception as e:
+                response = _STATUS_ERROR + str(e).encode("utf-8")
+            _write_message(writer, response)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(address: str, model, max_batch: int, max_wait: float) -> None:
+    """Serve a loaded model on a unix or tcp address until cancelled."""
+    batcher = DynamicBatcher(model, max_batch=max_batch, max_wait=max_wait)
+    batcher.start()
+
+    def handler(reader, writer):
+        return _handle_connection(batcher, reader, writer)
+
+    family, target = parse_address(address)
+    if family == "unix":
+        if os.path.exists(target):
+            os.unlink(target)
+        server = await asyncio.start_unix_server(handler, path=target)
+    else:
+        server = await asyncio.start_server(handler, host=target[0], port=target[1])
+
+    logger.info(f"Embedding service listening on {address}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+class EmbeddingServiceClient:
+    """
+    Blocking client with the SentenceTransformer.encode interface.
+
+    Keeps one connection per client (shared by threads under a lock) and
+    reconnects once when the connection was dropped.
+    """
+
+    def __init__(self, address: str, timeout: float = 60.0) -> None:
+        """Create a client for a service address (connects lazily)."""
+        self.address = address
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        family, target = parse_address(self.address)
+        if family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(target)
+        return sock
+
+    def _receive(self, size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = self._socket.recv(min(size, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Embedding service closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _request(self, payload: bytes) -> bytes:
+        if self._socket is None:
+            self._socket = self._connect()
+        self._socket.sendall(_LENGTH.pack(len(payload)) + payload)
+        (length,) = _LENGTH.unpack(self._receive(_LENGTH.size))
+        return self._receive(length)
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        """
+        Encode one text or a list of texts through the service.
+
+        batch_size is accepted for compatibility; the service batches requests
+        itself. Returns a vector for a single text, otherwise a matrix.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        payload = json.dumps(texts).encode("utf-8")
+
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    response = self._request(payload)
+                    break
+                except OSError as e:
+                    if self._socket is not None:
+                        self._socket.close()
+                        self._socket = None
+                    if attempt:
+                        raise EmbeddingServiceError(
+                            f"Embedding service {self.address} unavailable: {e}"
+                        ) from e
+
+        if response[:1] != _STATUS_OK:
+            raise EmbeddingServiceError(response[1:].decode("utf-8", errors="replace"))
+        embeddings = np.frombuffer(response[1:], dtype=np.float32).reshape(len(texts), -1)
+        return embeddings[0] if single else embeddings
+
+
+def main() -> None:
+    """Load the embedding model and serve it on EMBEDDING_SERVICE_ADDRESS."""
+    from services.analysis import load_embedding_model
+
+    logging.basicConfig(level=logging.INFO)
+    address = settings.embedding_service_address or "tcp://0.0.0.0:7070"
+    asyncio.run(
+        serve(
+            address,
+            load_embedding_model(),
+            max_batch=settings.embedding_service_max_batch,
+            max_wait=settings.embedding_service_max_wait_ms / 1000,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
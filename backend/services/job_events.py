@@ -0,0 +1,113 @@
+"""Job progress events, published by workers and streamed to clients via Redis pub/sub."""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel prefix; one channel per job (Celery task ID)
+CHANNEL_PREFIX = "job-events:"
+
+# Job statuses after which no further events follow
+TERMINAL_STATUSES = ("completed", "failed")
+
+_publisher: Optional[redis.Redis] = None
+_subscriber: Optional[aioredis.Redis] = None
+
+
+def job_channel(job_id: str) -> str:
+    """Get the pub/sub channel of a job."""
+    return f"{CHANNEL_PREFIX}{job_id}"
+
+
+def _get_publisher() -> redis.Redis:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _publisher
+
+
+def publish_job_event(
+    job_id: Optional[str],
+    status: str,
+    stage: Optional[str] = None,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Publish a job status change to clients following the job.
+
+    The event has the shape of the GET /api/v1/jobs/{job_id} response. Best
+    effort: a Redis error is logged and never fails the task.
+    """
+    if not job_id:
+        return
+    event = {
+        "job_id": job_id,
+        "status": status,
+        "result": result,
+        "error": error,
+        "meta": {"stage": stage} if stage else None,
+    }
+    try:
+        _get_publisher().publish(job_channel(job_id), json.dumps(event, default=str))
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish event for job {job_id}: {e}")
+
+
+class JobEventSubscription:
+    """Subscription to the events of one job."""
+
+    def __init__(self, pubsub: aioredis.client.PubSub) -> None:
+        """Wrap a subscribed pub/sub connection."""
+        self.pubsub = pubsub
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait up to timeout seconds for the next event (None if there was none)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is not None and message["type"] == "message":
+                return json.loads(message["data"])
+
+    async def close(self) -> None:
+        """Unsubscribe and release the Redis connection."""
+        try:
+            await self.pubsub.unsubscribe()
+            await self.pubsub.aclose()
+        except redis.RedisError as e:
+            logger.debug(f"Closing job event subscription failed: {e}")
+
+
+async def subscribe_job_events(job_id: str) -> JobEventSubscription:
+    """
+    Subscribe to the events of a job.
+
+    Subscribe before reading the current status, so no transition is missed.
+    Raises redis.RedisError if Redis is unavailable.
+    """
+    global _subscriber
+    if _subscriber is None:
+        _subscriber = aioredis.Redis.from_url(settings.redis_url, socket_connect_timeout=2)
+    # Each subscription holds its own connection from the shared pool
+    pubsub = _subscriber.pubsub()
+    try:
+        await pubsub.subscribe(job_channel(job_id))
+    except redis.RedisError:
+        await pubsub.aclose()
+        raise
+    return JobEventSubscription(pubsub)
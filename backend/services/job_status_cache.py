@@ -0,0 +1,91 @@
+"""Short-lived Redis cache of finished job statuses served to polling clients."""
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for cached job statuses (by Celery task ID)
+KEY_PREFIX = "job-status:"
+
+# Seconds to skip Redis after a connection error
+REDIS_RETRY_SECONDS = 30.0
+
+_client: Optional[aioredis.Redis] = None
+_invalidator: Optional[redis.Redis] = None
+_redis_retry_at = 0.0
+
+
+def job_status_key(job_id: str) -> str:
+    """Get the cache key of a job status."""
+    return f"{KEY_PREFIX}{job_id}"
+
+
+def _get_client() -> Optional[aioredis.Redis]:
+    global _client
+    if settings.job_status_cache_ttl <= 0 or time.monotonic() < _redis_retry_at:
+        return None
+    if _client is None:
+        _client = aioredis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+    return _client
+
+
+def _redis_failed(error: Exception) -> None:
+    global _redis_retry_at
+    logger.warning(f"Job status cache unavailable: {error}")
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+
+async def get_cached_job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get the cached status of a finished job (None if not cached)."""
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        value = await client.get(job_status_key(job_id))
+    except redis.RedisError as e:
+        _redis_failed(e)
+        return None
+    return json.loads(value) if value is not None else None
+
+
+async def cache_job_status(job_id: str, status: Dict[str, Any]) -> None:
+    """Cache the status of a finished job for JOB_STATUS_CACHE_TTL seconds."""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        await client.set(
+            job_status_key(job_id),
+            json.dumps(status, default=str),
+            ex=settings.job_status_cache_ttl,
+        )
+    except redis.RedisError as e:
+        _redis_failed(e)
+
+
+def invalidate_job_status(job_id: Optional[str]) -> None:
+    """
+    Drop the cached status of a job (called by the worker when it finishes).
+
+    Best effort: a Redis error is logged; the entry then expires with its TTL.
+    """
+    global _invalidator
+    if not job_id or settings.job_status_cache_ttl <= 0:
+        return
+    if _invalidator is None:
+        _invalidator = redis.Redis.from_url(
+            settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    try:
+        _invalidator.delete(job_status_key(job_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate cached status of job {job_id}: {e}")
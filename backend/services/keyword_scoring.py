@@ -0,0 +1,124 @@
+"""Batched keyword (Jaccard) similarity over token-ID sets."""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from services.clause_index import tokenize
+
+# Token IDs are combined with the pair number into one int64 key
+_KEY_STRIDE = np.int64(1 << 32)
+
+
+class ClauseTokenCache:
+    """
+    Bounded LRU of clause token sets, keyed by clause ID.
+
+    Used for clauses without an in-process ClauseEmbeddingIndex (whose snapshot
+    already holds token sets), so their texts are tokenized once per process
+    rather than on every call. Each entry keeps the text it was built from; a
+    clause edited by the sync is tokenized again.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Keep up to max_entries clauses (0 disables the cache)."""
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[UUID, Tuple[str, Set[str]]]" = OrderedDict()
+
+    def get(self, clause_id: UUID, text: str) -> Set[str]:
+        """Get the token set of a clause, tokenizing its text on a miss."""
+        entry = self._tokens.get(clause_id)
+        if entry is not None and entry[0] == text:
+            self._tokens.move_to_end(clause_id)
+            return entry[1]
+
+        tokens = tokenize(text)
+        if self.max_entries > 0:
+            self._tokens[clause_id] = (text, tokens)
+            self._tokens.move_to_end(clause_id)
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+def build_vocabulary(
+    token_sets: Iterable[Set[str]],
+) -> Tuple[Dict[str, int], List[np.ndarray]]:
+    """
+    Build a keyword vocabulary of clause token sets and get their token-ID sets.
+
+    The vocabulary lives only as long as the caller keeps it.
+    """
+    vocabulary: Dict[str, int] = {}
+    token_ids = [
+        np.unique(
+            np.asarray(
+                [vocabulary.setdefault(token, len(vocabulary)) for token in tokens],
+                dtype=np.int64,
+            )
+        )
+        for tokens in token_sets
+    ]
+    return vocabulary, token_ids
+
+
+def encode_text(text: str, vocabulary: Dict[str, int]) -> Tuple[np.ndarray, int]:
+    """
+    Look up the token IDs of a document segment in a clause vocabulary.
+
+    The vocabulary is only read: tokens that no clause contains cannot be in any
+    intersection and are dropped. The number of distinct tokens of the text is
+    returned as well, so Jaccard unions still count them.
+    """
+    tokens = tokenize(text)
+    token_ids = [vocabulary[token] for token in tokens if token in vocabulary]
+    return np.unique(np.asarray(token_ids, dtype=np.int64)), len(tokens)
+
+
+def jaccard_scores(
+    left: List[np.ndarray],
+    right: List[np.ndarray],
+    left_sizes: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Compute Jaccard similarity for aligned pairs of token-ID sets.
+
+    Pair i compares left[i] with right[i]. All pairs are intersected at once:
+    each token ID is tagged with its pair number and the tagged arrays of both
+    sides are intersected with a single sort, then counted per pair.
+
+    left_sizes gives the full set sizes of the left side when its arrays only
+    hold the tokens known to the vocabulary (see encode_text).
+
+    Returns a float array with one score per pair (0 when either set is empty).
+    """
+    pair_count = len(left)
+    if pair_count == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    left_lengths = np.fromiter((len(ids) for ids in left), dtype=np.int64, count=pair_count)
+    right_sizes = np.fromiter((len(ids) for ids in right), dtype=np.int64, count=pair_count)
+    pairs = np.arange(pair_count, dtype=np.int64)
+
+    left_keys = np.repeat(pairs, left_lengths) * _KEY_STRIDE
+    right_keys = np.repeat(pairs, right_sizes) * _KEY_STRIDE
+    if len(left_keys):
+        left_keys += np.concatenate(left)
+    if len(right_keys):
+        right_keys += np.concatenate(right)
+
+    if left_sizes is None:
+        left_sizes = left_lengths
+
+    common = np.intersect1d(left_keys, right_keys, assume_unique=True)
+    intersections = np.bincount(common // _KEY_STRIDE, minlength=pair_count)
+    unions = left_sizes + right_sizes - intersections
+
+    scores = np.zeros(pair_count, dtype=np.float64)
+    valid = (left_sizes > 0) & (right_sizes > 0)
+    scores[valid] = intersections[valid] / unions[valid]
+    return scores
@@ -1,10 +1,36 @@
 """OCR service using Tesseract with Polish language support."""
 import io
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter
 
 from config import settings
+from monitoring.metrics import record_ocr_pages
+
+
+class OCRWord:
+    """Recognized word with its bounding box in image pixels."""
+
+    def __init__(
+        self,
+        text: str,
+        confidence: float,
+        left: int,
+        top: int,
+        width: int,
+        height: int,
+        page_number: Optional[int] = None,
+    ):
+        self.text = text
+        self.confidence = confidence
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.page_number = page_number
 
 
 class OCRResult:
@@ -17,15 +43,64 @@ class OCRResult:
         ocr_used: bool = True,
         language: str = "pol",
         preprocessing_applied: bool = False,
+        words: Optional[List[OCRWord]] = None,
+        dpi: Optional[int] = None,
+        escalated: bool = False,
+        page_number: Optional[int] = None,
+        pages: Optional[List["OCRResult"]] = None,
     ):
         self.text = text
         self.confidence = confidence
         self.ocr_used = ocr_used
         self.language = language
         self.preprocessing_applied = preprocessing_applied
+        self.words = words or []
+        self.dpi = dpi  # Rasterization resolution (PDF pages only)
+        self.escalated = escalated  # Fast pass was not confident enough
+        self.page_number = page_number  # 0-based PDF page
+        self.pages = pages or []  # Per-page results of a multi-page result
         self.success = len(text.strip()) > 0
 
 
+def _read_tesseract_data(data: Dict[str, List[Any]]) -> Tuple[str, List[OCRWord]]:
+    """
+    Rebuild text and words from Tesseract's image_to_data output.
+
+    Words of a line are joined with spaces, lines with newlines and
+    paragraphs with blank lines, like image_to_string does.
+    """
+    paragraphs: List[List[List[str]]] = []
+    words: List[OCRWord] = []
+    current_paragraph = current_line = None
+
+    for i, text in enumerate(data["text"]):
+        text = str(text).strip()
+        if not text:
+            continue
+        paragraph = (data["page_num"][i], data["block_num"][i], data["par_num"][i])
+        line = (*paragraph, data["line_num"][i])
+        if paragraph != current_paragraph:
+            paragraphs.append([])
+            current_paragraph, current_line = paragraph, None
+        if line != current_line:
+            paragraphs[-1].append([])
+            current_line = line
+        paragraphs[-1][-1].append(text)
+        words.append(
+            OCRWord(
+                text=text,
+                confidence=max(float(data["conf"][i]), 0.0) / 100.0,
+                left=int(data["left"][i]),
+                top=int(data["top"][i]),
+                width=int(data["width"][i]),
+                height=int(data["height"][i]),
+            )
+        )
+
+    text = "\n\n".join("\n".join(" ".join(line) for line in lines) for lines in paragraphs)
+    return text, words
+
+
 class OCRService:
     """Service for OCR operations with Tesseract."""
 
@@ -37,6 +112,9 @@ class OCRService:
 
         self.languages = settings.tesseract_languages
 
+        # Pages OCR-ed at the same time (each by its own Tesseract process)
+        self.workers = max(1, settings.ocr_workers)
+
     def preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         Preprocess image for better OCR accuracy.
@@ -71,18 +149,56 @@ class OCRService:
         """
         Extract text from image using Tesseract OCR.
 
+        With OCR_ADAPTIVE, the image is first OCR-ed without preprocessing and
+        preprocessed only if that pass is not confident enough.
+
         Args:
             image_data: Raw image bytes
             language: Language code (pol, eng, pol+eng)
-            preprocess: Whether to apply preprocessing
+            preprocess: Whether to apply preprocessing (when needed)
 
         Returns:
             OCRResult with extracted text and confidence score
         """
         try:
-            # Load image
             image = Image.open(io.BytesIO(image_data))
+        except Exception:
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                ocr_used=True,
+                language=language,
+                preprocessing_applied=False,
+            )
+        if not (preprocess and settings.ocr_adaptive):
+            record_ocr_pages("full")
+            return self.ocr_image(image, language=language, preprocess=preprocess)
+
+        result = self.ocr_image(image, language=language, preprocess=False)
+        if result.confidence >= settings.ocr_min_confidence:
+            record_ocr_pages("fast")
+            return result
+        record_ocr_pages("escalated")
+        return self._keep_better(result, self.ocr_image(image, language=language))
+
+    def ocr_image(
+        self,
+        image: Image.Image,
+        language: str = "pol",
+        preprocess: bool = True,
+    ) -> OCRResult:
+        """
+        Extract text from an already decoded image using Tesseract OCR.
+
+        Args:
+            image: PIL image (e.g. a rasterized PDF page)
+            language: Language code (pol, eng, pol+eng)
+            preprocess: Whether to apply preprocessing
 
+        Returns:
+            OCRResult with extracted text and confidence score
+        """
+        try:
             # Preprocess if requested
             if preprocess:
                 image = self.preprocess_image(image)
@@ -90,27 +206,26 @@ class OCRService:
             # Configure Tesseract
             config = "--oem 3 --psm 3"  # LSTM engine, automatic page segmentation
 
-            # Extract text with confidence data
+            # Single Tesseract pass: text, confidences and word boxes
             data = pytesseract.image_to_data(
                 image,
                 lang=language,
                 config=config,
                 output_type=pytesseract.Output.DICT,
             )
+            text, words = _read_tesseract_data(data)
 
             # Calculate average confidence (excluding -1 values)
-            confidences = [int(conf) for conf in data["conf"] if int(conf) > 0]
+            confidences = [float(conf) for conf in data["conf"] if float(conf) > 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
 
-            # Extract text
-            text = pytesseract.image_to_string(image, lang=language, config=config)
-
             return OCRResult(
-                text=text.strip(),
+                text=text,
                 confidence=avg_confidence / 100.0,  # Convert to 0-1 range
                 ocr_used=True,
                 language=language,
                 preprocessing_applied=preprocess,
+                words=words,
             )
 
         except Exception:
@@ -122,6 +237,120 @@ class OCRService:
                 preprocessing_applied=False,
             )
 
+    def render_page(self, page: Any, dpi: Optional[int] = None) -> Image.Image:
+        """
+        Rasterize a PyMuPDF page to a grayscale image for OCR (OCR_DPI by default).
+
+        Grayscale needs a third of the memory of RGB; preprocessing converts
+        to grayscale anyway.
+        """
+        import fitz  # PyMuPDF
+
+        pixmap = page.get_pixmap(dpi=dpi or settings.ocr_dpi, colorspace=fitz.csGRAY, alpha=False)
+        return Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+
+    def ocr_pdf_pages(
+        self,
+        doc: Any,
+        page_numbers: Iterable[int],
+        language: str = "pol",
+    ) -> List[OCRResult]:
+        """
+        Rasterize and OCR pages of an open PyMuPDF document, keeping page order.
+
+        With OCR_ADAPTIVE, pages are first OCR-ed at OCR_FAST_DPI without
+        preprocessing. Only pages below OCR_MIN_CONFIDENCE are redone at OCR_DPI
+        with preprocessing, keeping the more confident result. Each result
+        reports the path used (dpi, preprocessing_applied, escalated).
+        """
+        page_numbers = list(page_numbers)
+        if not settings.ocr_adaptive:
+            results = self._ocr_rendered_pages(doc, page_numbers, language, settings.ocr_dpi)
+            record_ocr_pages("full", len(results))
+            return results
+
+        results = self._ocr_rendered_pages(
+            doc, page_numbers, language, settings.ocr_fast_dpi, preprocess=False
+        )
+        retry = [
+            i for i, result in enumerate(results) if result.confidence < settings.ocr_min_confidence
+        ]
+        if retry:
+            full_results = self._ocr_rendered_pages(
+                doc, [page_numbers[i] for i in retry], language, settings.ocr_dpi
+            )
+            for i, full_result in zip(retry, full_results):
+                results[i] = self._keep_better(results[i], full_result)
+
+        record_ocr_pages("fast", len(results) - len(retry))
+        record_ocr_pages("escalated", len(retry))
+        return results
+
+    def _ocr_rendered_pages(
+        self,
+        doc: Any,
+        page_numbers: List[int],
+        language: str,
+        dpi: int,
+        preprocess: bool = True,
+    ) -> List[OCRResult]:
+        """
+        Render pages at dpi and OCR them concurrently, keeping page order.
+
+        Pages are rendered one at a time and OCR-ed by up to OCR_WORKERS
+        Tesseract processes (the threads only wait for them). At most
+        OCR_WORKERS page images exist at once (each is released after its OCR),
+        so memory does not grow with page count.
+        """
+        results: List[OCRResult] = []
+        pending: Deque[Tuple[int, "Future[OCRResult]"]] = deque()
+
+        def collect(page_number: int, future: "Future[OCRResult]") -> None:
+            result = future.result()
+            result.dpi = dpi
+            result.page_number = page_number
+            for word in result.words:
+                word.page_number = page_number
+            results.append(result)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for page_number in page_numbers:
+                if len(pending) >= self.workers:
+                    collect(*pending.popleft())
+                image = self.render_page(doc[page_number], dpi=dpi)
+                future = pool.submit(self.ocr_image, image, language, preprocess)
+                pending.append((page_number, future))
+                del image
+            while pending:
+                collect(*pending.popleft())
+        return results
+
+    def _keep_better(self, fast_result: OCRResult, full_result: OCRResult) -> OCRResult:
+        """Pick the more confident of a fast-pass and a full-pass result."""
+        result = full_result if full_result.confidence >= fast_result.confidence else fast_result
+        result.escalated = True
+        return result
+
+    def combine_results(self, results: List[OCRResult], language: str = "pol") -> OCRResult:
+        """Combine per-page OCR results into one result for the document."""
+        all_text = [result.text for result in results]
+        all_confidences = [result.confidence for result in results]
+        all_words = [word for result in results for word in result.words]
+
+        # Combine results
+        combined_text = "\n\n".join(all_text)
+        avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0.0
+
+        return OCRResult(
+            text=combined_text,
+            confidence=avg_confidence,
+            ocr_used=True,
+            language=language,
+            preprocessing_applied=any(result.preprocessing_applied for result in results),
+            words=all_words,
+            pages=results,
+        )
+
     def is_text_layer_present(self, pdf_path: str) -> bool:
         """
         Check if PDF has a text layer (native text vs scanned).
@@ -153,41 +382,11 @@ class OCRService:
         This is used when PDF doesn't have a native text layer.
         """
         try:
-            from pdf2image import convert_from_path
-
-            # Convert PDF pages to images
-            images = convert_from_path(pdf_path, dpi=300)
-
-            all_text = []
-            all_confidences = []
+            import fitz  # PyMuPDF
 
-            for i, image in enumerate(images):
-                # Convert PIL Image to bytes
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format="PNG")
-                img_byte_arr.seek(0)
-
-                # Run OCR on image
-                result = self.extract_text_from_image(
-                    img_byte_arr.read(),
-                    language=language,
-                    preprocess=True,
-                )
-
-                all_text.append(result.text)
-                all_confidences.append(result.confidence)
-
-            # Combine results
-            combined_text = "\n\n".join(all_text)
-            avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0.0
-
-            return OCRResult(
-                text=combined_text,
-                confidence=avg_confidence,
-                ocr_used=True,
-                language=language,
-                preprocessing_applied=True,
-            )
+            with fitz.open(pdf_path) as doc:
+                results = self.ocr_pdf_pages(doc, range(doc.page_count), language=language)
+            return self.combine_results(results, language=language)
 
         except Exception:
             return OCRResult(
@@ -6,6 +6,9 @@ from docx import Document as DocxDocument
 
 from services.ocr import OCRResult, ocr_service
 
+# Pages with less native text than this are OCR-ed if they contain an image
+MIN_NATIVE_PAGE_CHARS = 50
+
 
 class DocumentSection:
     """Represents a section of a document."""
@@ -53,62 +56,74 @@ class DocumentParser:
         Parse PDF document using PyMuPDF (fitz).
 
         Strategy:
-        1. Try to extract native text layer
-        2. If no text or low quality, use OCR
+        1. Extract the native text layer of every page
+        2. OCR only the pages without meaningful native text (scanned pages)
         3. Extract metadata and structure
 
         PyMuPDF is faster and better preserves document structure than pdfplumber.
         """
         try:
-            doc = fitz.open(file_path)
-            pages_count = len(doc)
-
-            # Extract metadata
-            metadata = {
-                "title": doc.metadata.get("title", ""),
-                "author": doc.metadata.get("author", ""),
-                "subject": doc.metadata.get("subject", ""),
-                "creator": doc.metadata.get("creator", ""),
-                "producer": doc.metadata.get("producer", ""),
-                "creation_date": doc.metadata.get("creationDate", ""),
-            }
-
-            # Try native text extraction
+            with fitz.open(file_path) as doc:
+                pages_count = len(doc)
+
+                # Extract metadata
+                metadata = {
+                    "title": doc.metadata.get("title", ""),
+                    "author": doc.metadata.get("author", ""),
+                    "subject": doc.metadata.get("subject", ""),
+                    "creator": doc.metadata.get("creator", ""),
+                    "producer": doc.metadata.get("producer", ""),
+                    "creation_date": doc.metadata.get("creationDate", ""),
+                }
+
+                # Native text per page; scanned pages are OCR-ed in one batch
+                page_texts = [doc[page_num].get_text("text") for page_num in range(pages_count)]
+                ocr_pages = [
+                    page_num
+                    for page_num, page_text in enumerate(page_texts)
+                    if self._needs_ocr(doc[page_num], page_text)
+                ]
+
+                ocr_result = None
+                if ocr_pages:
+                    page_results = ocr_service.ocr_pdf_pages(doc, ocr_pages, language)
+                    for page_num, page_result in zip(ocr_pages, page_results):
+                        page_texts[page_num] = page_result.text
+                    ocr_result = ocr_service.combine_results(page_results, language)
+                    metadata["ocr_pages"] = [
+                        {
+                            "page": page_num + 1,
+                            "dpi": page_result.dpi,
+                            "preprocessed": page_result.preprocessing_applied,
+                            "escalated": page_result.escalated,
+                            "confidence": round(page_result.confidence, 3),
+                        }
+                        for page_num, page_result in zip(ocr_pages, page_results)
+                    ]
+
+            # Create section per page
             all_text = []
             sections = []
-
-            for page_num in range(pages_count):
-                page = doc[page_num]
-                page_text = page.get_text("text")  # Extract plain text
-
-                if page_text:
-                    all_text.append(page_text)
-
-                    # Create section per page
-                    section = DocumentSection(
+            position = 0
+            for page_num, page_text in enumerate(page_texts):
+                if not page_text.strip():
+                    continue
+                if all_text:
+                    position += 2  # "\n\n" between pages
+                all_text.append(page_text)
+                sections.append(
+                    DocumentSection(
                         title=f"Page {page_num + 1}",
                         content=page_text,
-                        start_position=len("\n\n".join(all_text[:-1])),
-                        end_position=len("\n\n".join(all_text)),
+                        start_position=position,
+                        end_position=position + len(page_text),
                         page_number=page_num + 1,
                     )
-                    sections.append(section)
+                )
+                position += len(page_text)
 
             full_text = "\n\n".join(all_text)
 
-            # Check if we got meaningful text
-            ocr_result = None
-            if len(full_text.strip()) < 100:
-                # Low quality or no text - use OCR
-                doc.close()  # Close before OCR
-                ocr_result = ocr_service.extract_from_pdf_pages(file_path, language)
-                full_text = ocr_result.text
-
-                # Recreate sections from OCR text
-                sections = self._create_sections_from_text(full_text, pages_count)
-            else:
-                doc.close()
-
             # Count words
             word_count = len(full_text.split())
 
@@ -131,6 +146,15 @@ class DocumentParser:
                 word_count=0,
             )
 
+    def _needs_ocr(self, page: fitz.Page, page_text: str) -> bool:
+        """
+        Check if a PDF page is scanned rather than native text.
+
+        A page needs OCR when it has (almost) no text layer but does contain an
+        image; short native pages (e.g. signatures) and blank pages do not.
+        """
+        return len(page_text.strip()) < MIN_NATIVE_PAGE_CHARS and bool(page.get_images())
+
     def parse_docx(self, file_path: str) -> ParsedDocument:
         """
         Parse DOCX document.
@@ -238,6 +262,8 @@ class DocumentParser:
                 metadata={
                     "source": "image_ocr",
                     "confidence": ocr_result.confidence,
+                    "preprocessed": ocr_result.preprocessing_applied,
+                    "escalated": ocr_result.escalated,
                 },
                 word_count=word_count,
                 ocr_result=ocr_result,
@@ -252,31 +278,6 @@ class DocumentParser:
                 word_count=0,
             )
 
-    def _create_sections_from_text(self, text: str, pages: int) -> List[DocumentSection]:
-        """Create sections by splitting text into pages."""
-        # Split text evenly across pages
-        words = text.split()
-        words_per_page = max(1, len(words) // pages)
-
-        sections = []
-        for i in range(pages):
-            start_idx = i * words_per_page
-            end_idx = (i + 1) * words_per_page if i < pages - 1 else len(words)
-
-            page_words = words[start_idx:end_idx]
-            page_text = " ".join(page_words)
-
-            section = DocumentSection(
-                title=f"Page {i + 1}",
-                content=page_text,
-                start_position=len(" ".join(words[:start_idx])),
-                end_position=len(" ".join(words[:end_idx])),
-                page_number=i + 1,
-            )
-            sections.append(section)
-
-        return sections
-
 
 # Singleton instance
 document_parser = DocumentParser()
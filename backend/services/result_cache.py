@@ -0,0 +1,161 @@
+"""Reuse of completed analyses for identical uploaded files."""
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.analysis import Analysis, FlaggedClause
+from models.clause import ProhibitedClause
+from models.document import Document, DocumentMetadata
+from services.clause_corpus import get_corpus_version
+from services.clause_index import MODEL_NAME
+
+logger = logging.getLogger(__name__)
+
+# Analysis.options key holding the inputs an analysis result depends on
+RESULT_CACHE_OPTION = "result_cache"
+
+
+async def build_result_cache_key(session: AsyncSession, user_id: Optional[UUID]) -> dict:
+    """
+    Describe everything besides file content and language that shapes a result.
+
+    That is the clause corpus version, the embedding model and runtime, the
+    similarity thresholds and, when the owner has custom clauses, the owner
+    (their clauses are matched as well).
+    """
+    clause_scope = None
+    if user_id is not None:
+        has_custom_clauses = await session.scalar(
+            select(
+                exists().where(
+                    ProhibitedClause.user_id == user_id,
+                    ProhibitedClause.is_active.is_(True),
+                )
+            )
+        )
+        if has_custom_clauses:
+            clause_scope = str(user_id)
+
+    return {
+        "corpus_version": await get_corpus_version(session),
+        "embedding_model": MODEL_NAME,
+        "embedding_backend": settings.analysis_embedding_backend,
+        # Keyed, not a list: JSONB containment matches arrays as sets
+        "thresholds": {
+            "low": settings.analysis_threshold_low,
+            "medium": settings.analysis_threshold_medium,
+            "high": settings.analysis_threshold_high,
+        },
+        "clause_scope": clause_scope,
+    }
+
+
+async def find_cached_analysis(
+    session: AsyncSession,
+    sha256_hash: Optional[str],
+    language: str,
+    cache_key: dict,
+) -> Optional[Analysis]:
+    """Find the latest completed offline analysis of the same file and inputs."""
+    if not settings.analysis_result_cache_enabled or not sha256_hash:
+        return None
+
+    result = await session.execute(
+        select(Analysis)
+        .join(Document, Analysis.document_id == Document.id)
+        .where(
+            Document.sha256_hash == sha256_hash,
+            Analysis.language == language,
+            Analysis.mode == "offline",
+            Analysis.status == "completed",
+            Analysis.options.contains({RESULT_CACHE_OPTION: cache_key}),
+        )
+        .order_by(Analysis.completed_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def clone_analysis(session: AsyncSession, source: Analysis, document: Document) -> Analysis:
+    """
+    Copy a completed analysis, its flagged clauses and text metadata to a document.
+
+    Marks the document as completed; the caller commits.
+    """
+    now = datetime.utcnow()
+    analysis = Analysis(
+        document_id=document.id,
+        mode=source.mode,
+        language=source.language,
+        options={**(source.options or {}), "cloned_from": str(source.id)},
+        status="completed",
+        total_clauses_found=source.total_clauses_found,
+        high_risk_count=source.high_risk_count,
+        medium_risk_count=source.medium_risk_count,
+        low_risk_count=source.low_risk_count,
+        risk_score=source.risk_score,
+        summary=source.summary,
+        results=source.results,
+        started_at=now,
+        completed_at=now,
+        duration_seconds=0,
+    )
+    session.add(analysis)
+    await session.flush()
+
+    flagged_result = await session.execute(
+        select(FlaggedClause).where(FlaggedClause.analysis_id == source.id)
+    )
+    for flagged in flagged_result.scalars():
+        session.add(
+            FlaggedClause(
+                analysis_id=analysis.id,
+                clause_id=flagged.clause_id,
+                matched_text=flagged.matched_text,
+                location=flagged.location,
+                page_number=flagged.page_number,
+                start_position=flagged.start_position,
+                end_position=flagged.end_position,
+                confidence=flagged.confidence,
+                risk_level=flagged.risk_level,
+                match_type=flagged.match_type,
+                explanation=flagged.explanation,
+            )
+        )
+
+    source_result = await session.execute(
+        select(Document, DocumentMetadata)
+        .outerjoin(DocumentMetadata, DocumentMetadata.document_id == Document.id)
+        .where(Document.id == source.document_id)
+    )
+    source_document, metadata = source_result.one()
+    if metadata is not None:
+        session.add(
+            DocumentMetadata(
+                document_id=document.id,
+                title=metadata.title,
+                author=metadata.author,
+                subject=metadata.subject,
+                keywords=metadata.keywords,
+                full_text=metadata.full_text,
+                text_length=metadata.text_length,
+                word_count=metadata.word_count,
+                sections=metadata.sections,
+                paragraphs=metadata.paragraphs,
+                ocr_pages=metadata.ocr_pages,
+            )
+        )
+
+    document.pages = source_document.pages
+    document.ocr_required = source_document.ocr_required
+    document.ocr_completed = source_document.ocr_completed
+    document.ocr_confidence = source_document.ocr_confidence
+    document.status = "completed"
+
+    logger.info(f"Reused analysis {source.id} for document {document.id}")
+    return analysis
@@ -1,54 +1,76 @@
 """File storage service using MinIO (S3-compatible)."""
 import hashlib
+import logging
 import secrets
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import BinaryIO, Optional
 
-from minio import Minio
-from minio.commonconfig import Filter
-from minio.error import S3Error
-from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
-
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class StorageService:
-    """Service for managing file storage with MinIO."""
+    """
+    Service for managing file storage with MinIO.
 
-    def __init__(self) -> None:
-        """Initialize MinIO client."""
-        import logging
+    The MinIO client is created, and the bucket ensured, on first use rather
+    than at import time, so importing the API does not wait for MinIO.
+    """
 
-        logger = logging.getLogger(__name__)
+    def __init__(self) -> None:
+        """Initialize the service (connects lazily)."""
+        self.bucket_name = settings.minio_bucket_name
+        self._client = None
+        self._connected = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """MinIO client, or None if MinIO could not be initialized."""
+        if not self._connected:
+            with self._lock:
+                if not self._connected:
+                    self._client = self._connect()
+                    self._connected = True
+        return self._client
+
+    def _connect(self):
+        """Create the MinIO client and ensure the bucket exists."""
+        from minio import Minio
 
         try:
-            self.client = Minio(
+            client = Minio(
                 settings.minio_endpoint,
                 access_key=settings.minio_access_key,
                 secret_key=settings.minio_secret_key.get_secret_value(),
                 secure=settings.minio_secure,
             )
-            self.bucket_name = settings.minio_bucket_name
-            self._ensure_bucket()
+            self._ensure_bucket(client)
             logger.info(
                 f"MinIO storage service initialized successfully (bucket: {self.bucket_name})"
             )
+            return client
         except Exception as e:
             logger.warning(
                 f"Failed to initialize MinIO storage service: {e}. "
                 "Storage operations will fail until MinIO is available. "
                 "Please ensure MinIO is running and accessible."
             )
-            # Set client to None to allow graceful degradation
-            self.client = None
-            self.bucket_name = settings.minio_bucket_name
+            # Return None to allow graceful degradation
+            return None
 
-    def _ensure_bucket(self) -> None:
+    def _ensure_bucket(self, client) -> None:
         """Ensure bucket exists, create if not."""
+        from minio.commonconfig import Filter
+        from minio.error import S3Error
+        from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+
         try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
+            if not client.bucket_exists(self.bucket_name):
+                client.make_bucket(self.bucket_name)
 
                 # Set lifecycle policy for guest uploads
                 lifecycle_config = LifecycleConfig(
@@ -61,7 +83,7 @@ class StorageService:
                         )
                     ]
                 )
-                self.client.set_bucket_lifecycle(self.bucket_name, lifecycle_config)
+                client.set_bucket_lifecycle(self.bucket_name, lifecycle_config)
         except S3Error as e:
             print(f"Error ensuring bucket: {e}")
 
@@ -144,6 +166,8 @@ class StorageService:
 
     def get_file_url(self, object_name: str, expires_in_hours: int = 24) -> str:
         """Generate presigned URL for file access."""
+        from minio.error import S3Error
+
         try:
             url = self.client.presigned_get_object(
                 bucket_name=self.bucket_name,
@@ -156,6 +180,8 @@ class StorageService:
 
     def download_file(self, object_name: str) -> bytes:
         """Download file from MinIO."""
+        from minio.error import S3Error
+
         try:
             response = self.client.get_object(self.bucket_name, object_name)
             data = response.read()
@@ -167,6 +193,8 @@ class StorageService:
 
     def delete_file(self, object_name: str) -> None:
         """Delete file from MinIO."""
+        from minio.error import S3Error
+
         try:
             self.client.remove_object(self.bucket_name, object_name)
         except S3Error as e:
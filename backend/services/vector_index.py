@@ -0,0 +1,235 @@
+"""pgvector nearest-neighbour search and ANN index management for clause embeddings."""
+from typing import List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy import text as sql_text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.clause import CLAUSE_LANGUAGES, ProhibitedClause, clause_embedding_index_name
+
+
+def to_vector_literals(embeddings: np.ndarray) -> List[str]:
+    """Format embedding rows as pgvector text literals."""
+    return ["[" + ",".join(str(float(x)) for x in embedding) + "]" for embedding in embeddings]
+
+
+async def _apply_search_settings(session: AsyncSession) -> None:
+    """
+    Set hnsw.ef_search for the current transaction behind PgBouncer.
+
+    Directly connected sessions get it as a startup parameter instead (see
+    database.connection.get_connect_args), which saves this round trip.
+    """
+    if settings.database_pgbouncer:
+        await session.execute(
+            sql_text(f"SET LOCAL hnsw.ef_search = {int(settings.database_hnsw_ef_search)}")
+        )
+
+
+def _language_condition(language: Optional[str]) -> str:
+    """
+    Build the clause language filter.
+
+    Indexed languages are inlined as literals (they come from a fixed whitelist):
+    the planner can only use a partial index when the query predicate matches it
+    in every plan, which is not the case for a bound parameter in a generic plan.
+    """
+    if language is None:
+        return ""
+    if language in CLAUSE_LANGUAGES:
+        return f"AND pc.language = '{language}'"
+    return "AND pc.language = :language"
+
+
+async def search_clause_embeddings(
+    session: AsyncSession,
+    embeddings: np.ndarray,
+    threshold: float,
+    limit: int,
+    language: Optional[str] = None,
+    user_id: Optional[UUID] = None,
+) -> List[tuple[int, UUID, float]]:
+    """
+    Run top-k cosine search for all embeddings in a single pgvector query.
+
+    All query vectors are sent as one bound array parameter and matched with a
+    LATERAL top-k subquery, so a whole document costs one database round-trip.
+
+    Candidates are the active shared clauses in the document language, served by
+    that language's partial HNSW index (search breadth set by hnsw.ef_search).
+    With a user_id, that user's custom clauses are searched as well and merged
+    into the same top-k. Without a language, clauses of all languages are used.
+
+    Returns (row, clause_id, similarity) hits ordered by row, then similarity.
+    """
+    if len(embeddings) == 0:
+        return []
+
+    language_condition = _language_condition(language)
+
+    # Use pgvector cosine distance (1 - cosine_similarity)
+    # Lower distance = higher similarity
+    candidates = f"""
+            (SELECT pc.id, 1 - (pc.embedding <=> q.embedding) AS similarity
+            FROM prohibited_clauses pc
+            WHERE pc.is_active AND pc.embedding IS NOT NULL
+            AND pc.user_id IS NULL {language_condition}
+            ORDER BY pc.embedding <=> q.embedding
+            LIMIT :limit)
+    """
+    if user_id is not None:
+        candidates += f"""
+            UNION ALL
+            (SELECT pc.id, 1 - (pc.embedding <=> q.embedding) AS similarity
+            FROM prohibited_clauses pc
+            WHERE pc.is_active AND pc.embedding IS NOT NULL
+            AND pc.user_id = :user_id {language_condition}
+            ORDER BY pc.embedding <=> q.embedding
+            LIMIT :limit)
+        """
+
+    query = f"""
+        SELECT idx, id, similarity
+        FROM (
+            SELECT q.idx, match.id, match.similarity,
+                   row_number() OVER (PARTITION BY q.idx ORDER BY match.similarity DESC) AS rank
+            FROM unnest(CAST(:embeddings AS text[])::vector[]) WITH ORDINALITY AS q(embedding, idx)
+            CROSS JOIN LATERAL ({candidates}) AS match
+        ) AS ranked
+        WHERE rank <= :limit AND similarity >= :threshold
+        ORDER BY idx, similarity DESC
+    """
+
+    params = {
+        "embeddings": to_vector_literals(embeddings),
+        "threshold": threshold,
+        "limit": limit,
+    }
+    if user_id is not None:
+        params["user_id"] = user_id
+    if ":language" in language_condition:
+        params["language"] = language
+
+    await _apply_search_settings(session)
+    result = await session.execute(sql_text(query), params)
+
+    # ORDINALITY is 1-based
+    return [(idx - 1, clause_id, similarity) for idx, clause_id, similarity in result]
+
+
+async def get_vector_index_status(session: AsyncSession, language: str = "pl") -> dict:
+    """
+    Report the build state of a language's clause embedding ANN index.
+
+    State is one of: missing, building, invalid (failed concurrent build), ready.
+    """
+    index_name = clause_embedding_index_name(language)
+    result = await session.execute(
+        sql_text(
+            """
+            SELECT am.amname, i.indisvalid, i.indisready,
+                   pg_relation_size(c.oid), pg_get_indexdef(c.oid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_am am ON am.oid = c.relam
+            WHERE c.relname = :name
+            """
+        ),
+        {"name": index_name},
+    )
+    index_row = result.first()
+
+    progress_result = await session.execute(
+        sql_text(
+            """
+            SELECT phase, tuples_done, tuples_total
+            FROM pg_stat_progress_create_index
+            WHERE relid = 'prohibited_clauses'::regclass
+            """
+        )
+    )
+    progress_row = progress_result.first()
+
+    await _apply_search_settings(session)
+    ef_search = (await session.execute(sql_text("SHOW hnsw.ef_search"))).scalar()
+
+    if progress_row is not None:
+        state = "building"
+    elif index_row is None:
+        state = "missing"
+    elif not (index_row[1] and index_row[2]):
+        state = "invalid"
+    else:
+        state = "ready"
+
+    return {
+        "index_name": index_name,
+        "state": state,
+        "method": index_row[0] if index_row else None,
+        "size_bytes": index_row[3] if index_row else None,
+        "definition": index_row[4] if index_row else None,
+        "ef_search": int(ef_search),
+        "build_phase": progress_row[0] if progress_row else None,
+        "build_tuples_done": progress_row[1] if progress_row else None,
+        "build_tuples_total": progress_row[2] if progress_row else None,
+    }
+
+
+async def measure_vector_index_recall(
+    session: AsyncSession,
+    sample_size: int = 20,
+    limit: int = 10,
+    seed: Optional[int] = None,
+    language: str = "pl",
+) -> Optional[float]:
+    """
+    Estimate recall@limit of a language's ANN index against exact search.
+
+    Query vectors are random active shared clause embeddings of the language
+    with small Gaussian noise added (so the query is not trivially its own
+    nearest neighbour). The same queries are then run with index scans disabled
+    to get the exact top-k.
+
+    Index scans are disabled with SET LOCAL, which lasts until the end of the
+    caller's transaction, so this should run last in a read-only request.
+
+    Returns the fraction of exact neighbours found by the index, or None when
+    there are no clause embeddings to sample.
+    """
+    result = await session.execute(
+        select(ProhibitedClause.embedding)
+        .where(
+            ProhibitedClause.is_active.is_(True),
+            ProhibitedClause.embedding.isnot(None),
+            ProhibitedClause.user_id.is_(None),
+            ProhibitedClause.language == language,
+        )
+        .order_by(sql_text("random()"))
+        .limit(sample_size)
+    )
+    samples = [np.asarray(row[0], dtype=np.float32) for row in result]
+    if not samples:
+        return None
+
+    rng = np.random.default_rng(seed)
+    queries = np.stack(samples)
+    queries += rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+
+    approximate = await search_clause_embeddings(
+        session, queries, threshold=-1.0, limit=limit, language=language
+    )
+
+    await session.execute(sql_text("SET LOCAL enable_indexscan = off"))
+    await session.execute(sql_text("SET LOCAL enable_bitmapscan = off"))
+    exact = await search_clause_embeddings(
+        session, queries, threshold=-1.0, limit=limit, language=language
+    )
+
+    approximate_hits = {(row, clause_id) for row, clause_id, _ in approximate}
+    exact_hits = {(row, clause_id) for row, clause_id, _ in exact}
+    if not exact_hits:
+        return None
+    return len(approximate_hits & exact_hits) / len(exact_hits)
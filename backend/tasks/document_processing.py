@@ -1,14 +1,14 @@
 """Celery tasks for document processing."""
-import asyncio
 import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 from uuid import UUID
 
 from celery_app import celery_app
-from services.parser import document_parser
-from services.storage import storage_service
+from database.connection import run_in_worker_loop
+from services.job_events import publish_job_event
+from services.job_status_cache import invalidate_job_status
 
 
 async def _store_metadata_and_analyze(
@@ -33,6 +33,7 @@ async def _store_metadata_and_analyze(
     from models.analysis import Analysis, FlaggedClause
     from models.document import Document, DocumentMetadata
     from services.analysis import get_analysis_service
+    from services.result_cache import RESULT_CACHE_OPTION, build_result_cache_key
 
     async with get_celery_db_context() as session:
         doc_uuid = UUID(document_id)
@@ -43,6 +44,9 @@ async def _store_metadata_and_analyze(
         if not document:
             raise ValueError(f"Document not found: {document_id}")
 
+        # Record the inputs the result depends on so identical files can reuse it
+        cache_key = await build_result_cache_key(session, document.user_id)
+
         # Store document metadata
         metadata = DocumentMetadata(
             document_id=doc_uuid,
@@ -59,6 +63,7 @@ async def _store_metadata_and_analyze(
                 ]
             },
             paragraphs=len(parsed_result.sections),
+            ocr_pages=parsed_result.metadata.get("ocr_pages"),
         )
         session.add(metadata)
 
@@ -75,6 +80,7 @@ async def _store_metadata_and_analyze(
             document_id=doc_uuid,
             mode="offline",
             language=language,
+            options={RESULT_CACHE_OPTION: cache_key},
             status="processing",
             started_at=datetime.utcnow(),
         )
@@ -87,6 +93,7 @@ async def _store_metadata_and_analyze(
             session=session,
             document_text=parsed_result.full_text,
             language=language,
+            user_id=document.user_id,
         )
 
         # Store flagged clauses
@@ -137,6 +144,52 @@ async def _store_metadata_and_analyze(
         }
 
 
+async def _reuse_cached_analysis(document_id: str, language: str) -> Optional[Dict]:
+    """
+    Copy the analysis of an identical, already analyzed file to the document.
+
+    Covers identical files uploaded before the first one finished processing.
+
+    Returns:
+        Dict with analysis results, or None when there is nothing to reuse
+    """
+    from sqlalchemy import select
+
+    from database.connection import get_celery_db_context
+    from models.document import Document
+    from services.result_cache import build_result_cache_key, clone_analysis, find_cached_analysis
+
+    async with get_celery_db_context() as session:
+        result = await session.execute(select(Document).where(Document.id == UUID(document_id)))
+        document = result.scalar_one_or_none()
+        if not document:
+            return None
+
+        cache_key = await build_result_cache_key(session, document.user_id)
+        cached = await find_cached_analysis(session, document.sha256_hash, language, cache_key)
+        if cached is None:
+            return None
+
+        analysis = await clone_analysis(session, cached, document)
+        await session.commit()
+
+        return {
+            "analysis_id": str(analysis.id),
+            "reused_analysis_id": str(cached.id),
+            "total_clauses_found": analysis.total_clauses_found,
+            "high_risk_count": analysis.high_risk_count,
+            "medium_risk_count": analysis.medium_risk_count,
+            "low_risk_count": analysis.low_risk_count,
+            "risk_score": analysis.risk_score,
+        }
+
+
+def _report_stage(task, stage: str) -> None:
+    """Record a processing stage in the task state and push it to job followers."""
+    task.update_state(state="PROCESSING", meta={"stage": stage})
+    publish_job_event(task.request.id, "processing", stage=stage)
+
+
 @celery_app.task(bind=True, name="tasks.process_document")
 def process_document(
     self,
@@ -157,14 +210,26 @@ def process_document(
     Returns:
         Dict with processing results
     """
+    # Imported here so the API, which queues this task, never loads the parsers
+    from services.parser import document_parser
+    from services.storage import storage_service
+
     # Map language codes
     lang_map = {"pl": "pol", "en": "eng", "pol": "pol", "eng": "eng"}
     ocr_language = lang_map.get(language, "pol")
     analysis_language = "pl" if language in ["pl", "pol"] else "en"
 
     try:
+        # Skip parsing, OCR and analysis if an identical file was analyzed meanwhile
+        reused = run_in_worker_loop(_reuse_cached_analysis(document_id, analysis_language))
+        if reused is not None:
+            result = {"document_id": document_id, "status": "completed", "analysis": reused}
+            invalidate_job_status(self.request.id)
+            publish_job_event(self.request.id, "completed", result=result)
+            return result
+
         # Update task state
-        self.update_state(state="PROCESSING", meta={"stage": "downloading"})
+        _report_stage(self, "downloading")
 
         # Download file from MinIO
         file_data = storage_service.download_file(object_name)
@@ -177,7 +242,7 @@ def process_document(
 
         try:
             # Update state
-            self.update_state(state="PROCESSING", meta={"stage": "parsing"})
+            _report_stage(self, "parsing")
 
             # Parse based on MIME type
             if mime_type == "application/pdf":
@@ -193,10 +258,10 @@ def process_document(
                 raise ValueError(f"Unsupported MIME type: {mime_type}")
 
             # Update state
-            self.update_state(state="PROCESSING", meta={"stage": "analyzing"})
+            _report_stage(self, "analyzing")
 
             # Store metadata and run analysis
-            analysis_result = asyncio.run(
+            analysis_result = run_in_worker_loop(
                 _store_metadata_and_analyze(
                     document_id=document_id,
                     parsed_result=parsed,
@@ -222,6 +287,17 @@ def process_document(
             # Clean up temp file
             Path(tmp_path).unlink(missing_ok=True)
 
+            invalidate_job_status(self.request.id)
+            publish_job_event(
+                self.request.id,
+                "completed",
+                result={
+                    "document_id": document_id,
+                    "status": "completed",
+                    "pages": parsed.pages,
+                    "analysis": analysis_result,
+                },
+            )
             return result
 
         except Exception:
@@ -240,9 +316,11 @@ def process_document(
         )
         # Try to update document status to failed
         try:
-            asyncio.run(_mark_document_failed(document_id, str(e)))
+            run_in_worker_loop(_mark_document_failed(document_id, str(e)))
         except Exception:
             pass  # Best effort
+        invalidate_job_status(self.request.id)
+        publish_job_event(self.request.id, "failed", error="Document processing failed")
         raise
 
 
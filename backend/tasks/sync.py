@@ -1,5 +1,4 @@
 """Celery task for synchronizing prohibited clauses from external source database."""
-import asyncio
 import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -9,31 +8,18 @@ from sqlalchemy import create_engine, select, text
 
 from celery_app import celery_app
 from config import settings
-from database.connection import get_celery_db_context
+from database.connection import get_celery_db_context, run_in_worker_loop
 from models.clause import ClauseCategory, ClauseLegalReference, LegalReference, ProhibitedClause
+from services.clause_corpus import bump_corpus_version
 
 logger = logging.getLogger(__name__)
 
-# Lazy-loaded embedding model (loaded only when needed)
-_embedding_model = None
-
-
-def get_embedding_model():
-    """Get or initialize the embedding model (lazy loading)."""
-    global _embedding_model
-    if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-
-        MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-        logger.info(f"Loading embedding model: {MODEL_NAME}")
-        _embedding_model = SentenceTransformer(MODEL_NAME)
-    return _embedding_model
-
 
 def generate_embedding(text: str) -> List[float]:
-    """Generate vector embedding for text."""
-    model = get_embedding_model()
-    embedding = model.encode(text, convert_to_numpy=True)
+    """Generate vector embedding for text (shared embedding service or local model)."""
+    from services.analysis import get_embedding_model
+
+    embedding = get_embedding_model().encode(text, convert_to_numpy=True)
     return embedding.tolist()
 
 
@@ -53,7 +39,7 @@ def sync_prohibited_clauses(self) -> Dict[str, int]:
     Returns:
         Dict with sync statistics (added, updated, skipped, errors)
     """
-    return asyncio.run(async_sync_prohibited_clauses())
+    return run_in_worker_loop(async_sync_prohibited_clauses())
 
 
 def fetch_clauses_from_source_db() -> List[Dict[str, Any]]:
@@ -362,9 +348,11 @@ async def async_sync_prohibited_clauses() -> Dict[str, int]:
                 else:
                     stats["errors"] += 1
 
-            # Update category clause count
+            # Update category clause count and invalidate cached clause indexes
             if stats["added"] > 0:
                 category.clause_count = stats["total_app"] + stats["added"]
+                version = await bump_corpus_version(db)
+                logger.info(f"Clause corpus version bumped to {version}")
                 await db.commit()
                 logger.info(f"Committed {stats['added']} new clauses")
 
@@ -0,0 +1,108 @@
+"""Celery worker process lifecycle hooks."""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+from sqlalchemy import text
+
+from config import settings
+from database.connection import dispose_worker_state, run_in_worker_loop
+from monitoring.metrics import record_worker_warmup
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = "Warm-up sentence for the embedding model."
+
+
+@contextmanager
+def _warmup_stage(stage: str):
+    """Time one warm-up stage and record it."""
+    started = time.perf_counter()
+    yield
+    duration = time.perf_counter() - started
+    record_worker_warmup(stage, duration)
+    logger.info(f"Worker warm-up stage {stage} took {duration:.2f}s")
+
+
+async def _warm_up_database() -> None:
+    """Open database connections and build the in-memory clause index."""
+    from database.connection import get_celery_db_context
+    from services.clause_index import load_clause_index
+
+    async with get_celery_db_context() as session:
+        with _warmup_stage("database"):
+            await session.execute(text("SELECT 1"))
+
+        if settings.analysis_vector_backend == "memory":
+            with _warmup_stage("clause_index"):
+                await load_clause_index(session)
+
+
+def warm_up() -> None:
+    """
+    Prepare a worker process for its first task.
+
+    Loads the embedding model, runs one encode so lazily initialized runtime
+    state is set up, connects to the database and builds the clause index.
+    """
+    from services.analysis import get_analysis_service
+
+    with _warmup_stage("total"):
+        with _warmup_stage("model"):
+            service = get_analysis_service()
+
+        with _warmup_stage("encode"):
+            # Bypasses the embedding cache so a forward pass really happens
+            service.model.encode([WARMUP_TEXT], batch_size=1, convert_to_numpy=True)
+
+        run_in_worker_loop(_warm_up_database())
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs) -> None:
+    """
+    Serve the metrics of all worker children from the parent process.
+
+    Children record metrics into PROMETHEUS_MULTIPROC_DIR (prometheus_client
+    multiprocess mode); the parent aggregates the files on every scrape. Runs
+    before the pool starts, so files left by a previous run can be removed.
+    """
+    if not settings.celery_metrics_port:
+        return
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir:
+        logger.warning("CELERY_METRICS_PORT is set without PROMETHEUS_MULTIPROC_DIR")
+        return
+
+    for path in Path(multiproc_dir).glob("*.db"):
+        path.unlink()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+    start_http_server(settings.celery_metrics_port, registry=registry)
+    logger.info(f"Serving worker metrics on port {settings.celery_metrics_port}")
+
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs) -> None:
+    """Warm up each worker child; tasks load anything that failed lazily."""
+    if not settings.celery_worker_warmup:
+        return
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Worker warm-up failed")
+
+
+@worker_process_shutdown.connect
+def close_worker_process(**kwargs) -> None:
+    """Close the database connections of an exiting worker child."""
+    try:
+        dispose_worker_state()
+    except Exception:
+        logger.exception("Closing worker database connections failed")
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
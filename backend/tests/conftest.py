@@ -11,7 +11,7 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from api.deps import create_access_token
-from database.connection import Base, get_db
+from database.connection import Base, get_db, get_read_db
 from models.user import User
 
 # Test database URL - use PostgreSQL (same instance, different database)
@@ -77,6 +77,7 @@ async def app(db_session: AsyncSession) -> FastAPI:
         yield db_session
 
     fastapi_app.dependency_overrides[get_db] = override_get_db
+    fastapi_app.dependency_overrides[get_read_db] = override_get_db
 
     yield fastapi_app
 
@@ -211,3 +211,36 @@ class TestTriggerClauseSync:
         response = await client.post("/api/v1/admin/sync-clauses")
 
         assert response.status_code == 401
+
+
+class TestGetVectorIndex:
+    """Tests for GET /api/v1/admin/vector-index endpoint."""
+
+    async def test_vector_index_as_admin(
+        self, client: AsyncClient, admin_user: User, admin_token: str
+    ):
+        """Test getting clause embedding index status as admin."""
+        response = await client.get(
+            "/api/v1/admin/vector-index",
+            headers=auth_headers(admin_token),
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["index_name"] == "ix_prohibited_clauses_embedding_hnsw_pl"
+        assert data["state"] == "ready"
+        assert data["method"] == "hnsw"
+        assert data["ef_search"] > 0
+        # No clause embeddings to sample
+        assert data["recall"] is None
+
+    async def test_vector_index_as_reviewer(
+        self, client: AsyncClient, reviewer_user: User, reviewer_token: str
+    ):
+        """Test getting clause embedding index status as reviewer fails (admin only)."""
+        response = await client.get(
+            "/api/v1/admin/vector-index",
+            headers=auth_headers(reviewer_token),
+        )
+
+        assert response.status_code == 403
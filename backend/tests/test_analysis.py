@@ -0,0 +1,878 @@
+"""Tests for the clause analysis service."""
+import fcntl
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import numpy as np
+import pytest
+import pytest_asyncio
+import redis
+from huggingface_hub import try_to_load_from_cache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.clause import ClauseCategory, ClauseLegalReference, LegalReference, ProhibitedClause
+from services.analysis import MODEL_NAME, ClauseAnalysisService, ClauseDetails, load_embedding_model
+from services.clause_corpus import bump_corpus_version
+from services.clause_index import (
+    EMBEDDING_DIMENSION,
+    ClauseEmbeddingIndex,
+    get_clause_index,
+    snapshot_path,
+    tokenize,
+)
+from services.embedding_cache import EmbeddingCache, get_embedding_cache
+from services.embedding_parity import compare_embedding_models, seeded_clause_texts
+from services.keyword_scoring import ClauseTokenCache, build_vocabulary, encode_text, jaccard_scores
+from services.vector_index import get_vector_index_status, measure_vector_index_recall
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PENALTY_CLAUSE = (
+    "Konsument zobowiązany jest do zapłaty kary umownej w wysokości "
+    "pięćdziesięciu procent wartości zamówienia."
+)
+JURISDICTION_CLAUSE = (
+    "Wszelkie spory wynikające z umowy rozstrzygane będą przez sąd "
+    "właściwy dla siedziby sprzedawcy."
+)
+NEUTRAL_PARAGRAPH = (
+    "Sprzedawca dostarczy towar w terminie czternastu dni od daty zawarcia "
+    "umowy na adres wskazany przez kupującego."
+)
+
+
+def unit_vector(index: int) -> np.ndarray:
+    """Build a normalized one-hot embedding."""
+    vector = np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer keyed by known texts."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]) -> None:
+        self.vectors = vectors
+        self.calls: List[dict] = []
+
+    def _vector(self, text: str) -> np.ndarray:
+        for known_text, vector in self.vectors.items():
+            if known_text in text:
+                return vector
+        return unit_vector(EMBEDDING_DIMENSION - 1)
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True):
+        self.calls.append({"texts": texts, "batch_size": batch_size})
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(text) for text in texts])
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands used by EmbeddingCache."""
+
+    def __init__(self) -> None:
+        self.store: Dict[str, bytes] = {}
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        self.store[key] = value
+
+    def execute(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_model() -> FakeEmbeddingModel:
+    """Create fake embedding model with one vector per known clause."""
+    return FakeEmbeddingModel(
+        {
+            PENALTY_CLAUSE: unit_vector(0),
+            JURISDICTION_CLAUSE: unit_vector(1),
+        }
+    )
+
+
+@pytest.fixture
+def analysis_service(fake_model: FakeEmbeddingModel, mocker) -> ClauseAnalysisService:
+    """Create analysis service backed by the fake embedding model."""
+    mocker.patch("services.analysis.get_embedding_model", return_value=fake_model)
+    service = ClauseAnalysisService()
+    service.embedding_cache = EmbeddingCache(MODEL_NAME, max_entries=100)
+    return service
+
+
+@pytest_asyncio.fixture
+async def seeded_clauses(db_session: AsyncSession) -> Dict[str, ProhibitedClause]:
+    """Seed prohibited clauses with known embeddings."""
+    category = ClauseCategory(
+        id=uuid4(),
+        code="test_category",
+        name_en="Test category",
+        name_pl="Kategoria testowa",
+    )
+    db_session.add(category)
+
+    clauses = {
+        "penalty": ProhibitedClause(
+            id=uuid4(),
+            category_id=category.id,
+            clause_text=PENALTY_CLAUSE,
+            normalized_text=PENALTY_CLAUSE.lower(),
+            risk_level="high",
+            embedding=unit_vector(0).tolist(),
+        ),
+        "jurisdiction": ProhibitedClause(
+            id=uuid4(),
+            category_id=category.id,
+            clause_text=JURISDICTION_CLAUSE,
+            normalized_text=JURISDICTION_CLAUSE.lower(),
+            risk_level="medium",
+            embedding=unit_vector(1).tolist(),
+        ),
+    }
+    db_session.add_all(clauses.values())
+
+    reference = LegalReference(
+        id=uuid4(),
+        article_code="XVII AmC 1234/10",
+        article_title="Wyrok sądowy - XVII AmC 1234/10",
+        description="Klauzula uznana za niedozwoloną",
+        law_name="Orzeczenie Sądu Ochrony Konkurencji i Konsumentów",
+    )
+    db_session.add(reference)
+    await db_session.flush()
+    db_session.add(
+        ClauseLegalReference(
+            clause_id=clauses["penalty"].id,
+            legal_reference_id=reference.id,
+        )
+    )
+    await db_session.commit()
+    return clauses
+
+
+@pytest.fixture
+def statement_counter(db_session: AsyncSession):
+    """Count SQL statements executed on the test engine."""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture
+async def scoped_clauses(
+    db_session: AsyncSession, seeded_clauses: Dict[str, ProhibitedClause]
+) -> Dict[str, ProhibitedClause]:
+    """Seed an English shared clause and custom clauses of two users."""
+    close_to_penalty = (unit_vector(0) * 0.9 + unit_vector(2) * 0.1).tolist()
+    clauses = {
+        "english": ProhibitedClause(
+            id=uuid4(),
+            category_id=seeded_clauses["penalty"].category_id,
+            clause_text="The consumer shall pay a contractual penalty.",
+            normalized_text="the consumer shall pay a contractual penalty.",
+            language="en",
+            embedding=close_to_penalty,
+        ),
+        "own": ProhibitedClause(
+            id=uuid4(),
+            user_id=uuid4(),
+            category_id=seeded_clauses["penalty"].category_id,
+            clause_text="Kara umowna za odstąpienie od umowy.",
+            normalized_text="kara umowna za odstąpienie od umowy.",
+            source="user",
+            embedding=close_to_penalty,
+        ),
+        "foreign": ProhibitedClause(
+            id=uuid4(),
+            user_id=uuid4(),
+            category_id=seeded_clauses["penalty"].category_id,
+            clause_text="Kara umowna za opóźnienie płatności.",
+            normalized_text="kara umowna za opóźnienie płatności.",
+            source="user",
+            embedding=close_to_penalty,
+        ),
+    }
+    db_session.add_all(clauses.values())
+    await db_session.commit()
+    return {**seeded_clauses, **clauses}
+
+
+class TestAnalyzeDocument:
+    """Tests for ClauseAnalysisService.analyze_document."""
+
+    async def test_segments_encoded_in_single_batch(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        fake_model: FakeEmbeddingModel,
+        seeded_clauses: Dict[str, ProhibitedClause],
+    ):
+        """Test that all segments are encoded with one batched model call."""
+        document_text = "\n\n".join([NEUTRAL_PARAGRAPH, PENALTY_CLAUSE, JURISDICTION_CLAUSE])
+
+        result = await analysis_service.analyze_document(db_session, document_text)
+
+        assert len(fake_model.calls) == 1
+        assert fake_model.calls[0]["texts"] == [
+            NEUTRAL_PARAGRAPH,
+            PENALTY_CLAUSE,
+            JURISDICTION_CLAUSE,
+        ]
+        assert fake_model.calls[0]["batch_size"] == analysis_service.embedding_batch_size
+        assert result.total_segments_analyzed == 3
+        assert {match.clause_id for match in result.matches} == {
+            seeded_clauses["penalty"].id,
+            seeded_clauses["jurisdiction"].id,
+        }
+
+    async def test_matching_uses_constant_number_of_queries(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        statement_counter: List[str],
+    ):
+        """Test that clause rows and legal references are not fetched per hit."""
+        document_text = "\n\n".join([PENALTY_CLAUSE, JURISDICTION_CLAUSE, PENALTY_CLAUSE + " ."])
+
+        result = await analysis_service.analyze_document(db_session, document_text)
+
+        # One vector query plus one clause/legal-reference query
+        assert len(statement_counter) == 2
+        matches = {match.clause_id: match for match in result.matches}
+        assert matches[seeded_clauses["penalty"].id].legal_references == [
+            {
+                "article_code": "XVII AmC 1234/10",
+                "article_title": "Wyrok sądowy - XVII AmC 1234/10",
+                "law_name": "Orzeczenie Sądu Ochrony Konkurencji i Konsumentów",
+                "description": "Klauzula uznana za niedozwoloną",
+            }
+        ]
+        assert matches[seeded_clauses["jurisdiction"].id].legal_references == []
+
+    async def test_empty_document(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        fake_model: FakeEmbeddingModel,
+    ):
+        """Test that a document without analyzable segments skips the model."""
+        result = await analysis_service.analyze_document(db_session, "Too short.")
+
+        assert fake_model.calls == []
+        assert result.total_segments_analyzed == 0
+        assert result.matches == []
+        assert result.risk_score == 0
+
+
+class TestEmbeddingCache:
+    """Tests for the segment embedding cache."""
+
+    def test_repeated_segments_are_encoded_once(
+        self,
+        analysis_service: ClauseAnalysisService,
+        fake_model: FakeEmbeddingModel,
+    ):
+        """Test that duplicate and previously seen texts skip the model."""
+        spaced_penalty = PENALTY_CLAUSE.replace(" ", "  \n ", 3)
+
+        first = analysis_service.generate_embeddings(
+            [PENALTY_CLAUSE, NEUTRAL_PARAGRAPH, spaced_penalty]
+        )
+        second = analysis_service.generate_embeddings([NEUTRAL_PARAGRAPH, PENALTY_CLAUSE])
+
+        assert [call["texts"] for call in fake_model.calls] == [[PENALTY_CLAUSE, NEUTRAL_PARAGRAPH]]
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(second, first[[1, 0]])
+
+    def test_local_tier_evicts_least_recently_used(self):
+        """Test that the in-process tier stays within max_entries."""
+        cache = EmbeddingCache(MODEL_NAME, max_entries=2)
+        keys = [cache.key(text) for text in ("a", "b", "c")]
+
+        cache.set_many({keys[0]: unit_vector(0), keys[1]: unit_vector(1)})
+        cache.get_many([keys[0]])
+        cache.set_many({keys[2]: unit_vector(2)})
+
+        assert len(cache) == 2
+        assert cache.get_many(keys)[1] is None
+        assert cache.key("a") != EmbeddingCache("other-model", max_entries=2).key("a")
+
+    def test_redis_tier_is_shared_between_processes(
+        self,
+        analysis_service: ClauseAnalysisService,
+        fake_model: FakeEmbeddingModel,
+    ):
+        """Test that vectors cached by one process are reused by another."""
+        shared = FakeRedis()
+        analysis_service.embedding_cache = EmbeddingCache(
+            MODEL_NAME, max_entries=100, redis_client=shared, ttl=60
+        )
+        expected = analysis_service.generate_embeddings([JURISDICTION_CLAUSE])
+
+        analysis_service.embedding_cache = EmbeddingCache(
+            MODEL_NAME, max_entries=100, redis_client=shared, ttl=60
+        )
+        actual = analysis_service.generate_embeddings([JURISDICTION_CLAUSE])
+
+        assert len(fake_model.calls) == 1
+        np.testing.assert_array_equal(actual, expected)
+        assert len(analysis_service.embedding_cache) == 1
+
+    def test_redis_errors_fall_back_to_model(
+        self,
+        analysis_service: ClauseAnalysisService,
+        fake_model: FakeEmbeddingModel,
+        mocker,
+    ):
+        """Test that an unreachable Redis only disables the shared tier."""
+        broken = mocker.MagicMock()
+        broken.mget.side_effect = redis.ConnectionError("down")
+        analysis_service.embedding_cache = EmbeddingCache(
+            MODEL_NAME, max_entries=100, redis_client=broken, ttl=60
+        )
+
+        embeddings = analysis_service.generate_embeddings([PENALTY_CLAUSE, PENALTY_CLAUSE])
+        analysis_service.generate_embeddings([PENALTY_CLAUSE])
+
+        assert len(fake_model.calls) == 1
+        assert broken.mget.call_count == 1
+        np.testing.assert_array_equal(embeddings[0], unit_vector(0))
+
+    def test_redis_tier_is_not_the_broker_db(self, mocker):
+        """Test that the shared tier connects to its own Redis URL, not the Celery broker's."""
+        mocker.patch("services.embedding_cache._embedding_cache", None)
+        mocker.patch(
+            "services.embedding_cache.settings.analysis_embedding_cache_redis_url",
+            "redis://cache:6379/0",
+        )
+        from_url = mocker.patch("services.embedding_cache.redis.Redis.from_url")
+
+        get_embedding_cache(MODEL_NAME)
+
+        assert from_url.call_args.args == ("redis://cache:6379/0",)
+
+
+class TestScoreMatches:
+    """Tests for batched hybrid scoring."""
+
+    @pytest.mark.parametrize("backend", ["pgvector", "memory"])
+    def test_matches_scalar_keyword_scoring(
+        self, analysis_service: ClauseAnalysisService, backend: str, mocker
+    ):
+        """Test that batched Jaccard and hybrid scores equal the per-pair set formula."""
+        clause_texts = [PENALTY_CLAUSE, JURISDICTION_CLAUSE, NEUTRAL_PARAGRAPH, "!!!"]
+        clauses = [
+            ClauseDetails(id=uuid4(), clause_text=text, risk_level="medium")
+            for text in clause_texts
+        ]
+        # With the memory backend the token sets come from the clause index
+        index = ClauseEmbeddingIndex.build(
+            [clause.id for clause in clauses],
+            np.stack([unit_vector(i) for i in range(len(clauses))]),
+            clause_texts=clause_texts,
+        )
+        mocker.patch.object(analysis_service, "vector_backend", backend)
+        mocker.patch("services.analysis.current_clause_index", return_value=index)
+        local_vocabulary = mocker.patch(
+            "services.analysis.build_vocabulary", wraps=build_vocabulary
+        )
+        segments = [
+            (PENALTY_CLAUSE, 0, len(PENALTY_CLAUSE)),
+            (JURISDICTION_CLAUSE + " " + PENALTY_CLAUSE, 10, 20),
+            ("...", 30, 33),
+        ]
+        similar = [
+            [(clauses[0], 0.95), (clauses[1], 0.85), (clauses[3], 0.99)],
+            [(clauses[1], 0.95), (clauses[2], 0.7), (clauses[0], 0.92)],
+            [(clauses[0], 0.97)],
+        ]
+
+        batched = analysis_service.score_matches(segments, similar)
+
+        for (text, _, _), candidates, matches in zip(segments, similar, batched):
+            expected = []
+            for clause, vector_score in candidates:
+                text_words, clause_words = tokenize(text), tokenize(clause.clause_text)
+                keyword_score = (
+                    len(text_words & clause_words) / len(text_words | clause_words)
+                    if text_words and clause_words
+                    else 0.0
+                )
+                hybrid = vector_score * 0.7 + keyword_score * 0.3
+                if hybrid >= analysis_service.VECTOR_THRESHOLD_LOW:
+                    expected.append((clause.id, hybrid))
+            assert [match.clause_id for match in matches] == [cid for cid, _ in expected]
+            for match, (_, hybrid) in zip(matches, expected):
+                assert match.similarity_score == pytest.approx(hybrid)
+        assert batched[0][0].risk_level == "high"
+        assert batched[0][0].match_type == "hybrid"
+        assert batched[2] == []
+        assert local_vocabulary.called == (backend == "pgvector")
+
+    def test_clause_texts_are_tokenized_once(self, analysis_service: ClauseAnalysisService, mocker):
+        """Test that pgvector hits reuse cached clause token sets across calls."""
+        mocker.patch.object(analysis_service, "vector_backend", "pgvector")
+        mocker.patch.object(analysis_service, "clause_token_cache", ClauseTokenCache(10))
+        tokenize_calls = mocker.patch("services.keyword_scoring.tokenize", wraps=tokenize)
+        clause = ClauseDetails(id=uuid4(), clause_text=PENALTY_CLAUSE, risk_level="high")
+        text = JURISDICTION_CLAUSE + " " + PENALTY_CLAUSE
+        segments = [(text, 0, len(text))]
+
+        first = analysis_service.score_matches(segments, [[(clause, 0.95)]])
+        second = analysis_service.score_matches(segments, [[(clause, 0.95)]])
+
+        clause_calls = [
+            call for call in tokenize_calls.call_args_list if call.args == (PENALTY_CLAUSE,)
+        ]
+        assert len(clause_calls) == 1
+        assert first[0][0].similarity_score == second[0][0].similarity_score
+
+    def test_clause_token_cache_is_bounded(self):
+        """Test that the least recently used clause is evicted and edited texts re-tokenized."""
+        cache = ClauseTokenCache(max_entries=2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+        cache.get(first, "kara umowna")
+        cache.get(second, "sąd właściwy")
+        cache.get(first, "kara umowna")
+
+        cache.get(third, "odstąpienie od umowy")
+
+        assert len(cache) == 2
+        assert second not in cache._tokens
+        assert cache.get(first, "kara umowna 50%") == {"kara", "umowna", "50"}
+
+    def test_segment_tokens_do_not_grow_vocabulary(self):
+        """Test that segment tokens are looked up read-only and unknown ones dropped."""
+        vocabulary, _ = build_vocabulary([tokenize("kara umowna")])
+
+        token_ids, size = encode_text("Kara umowna 500 zł", vocabulary)
+
+        assert set(vocabulary) == {"kara", "umowna"}
+        assert token_ids.tolist() == [0, 1]
+        assert size == 4
+
+    def test_jaccard_scores_of_aligned_pairs(self):
+        """Test intersection counting per pair, including empty token sets."""
+        scores = jaccard_scores(
+            [np.array([1, 2, 3]), np.array([], dtype=np.int64), np.array([5])],
+            [np.array([2, 3, 4]), np.array([1]), np.array([5])],
+        )
+
+        assert scores.tolist() == [0.5, 0.0, 1.0]
+
+    def test_jaccard_union_counts_dropped_tokens(self):
+        """Test that left_sizes keeps tokens unknown to the vocabulary in the union."""
+        scores = jaccard_scores([np.array([1, 2])], [np.array([1, 2])], left_sizes=np.array([4]))
+
+        assert scores.tolist() == [0.5]
+
+
+class TestEmbeddingBackend:
+    """Tests for embedding backend selection and the parity check."""
+
+    def test_onnx_int8_backend_loads_quantized_file(self, mocker):
+        """Test that onnx-int8 loads the configured quantized ONNX model."""
+        sentence_transformer = mocker.patch("services.analysis.SentenceTransformer")
+        mocker.patch(
+            "config.settings.analysis_embedding_onnx_int8_file", "onnx/model_qint8_arm64.onnx"
+        )
+
+        load_embedding_model("onnx-int8")
+
+        sentence_transformer.assert_called_once_with(
+            MODEL_NAME,
+            backend="onnx",
+            model_kwargs={"file_name": "onnx/model_qint8_arm64.onnx"},
+        )
+
+    def test_parity_report_flags_drift(self):
+        """Test that score drift beyond tolerance fails the parity check."""
+        texts = seeded_clause_texts()
+        rng = np.random.default_rng(0)
+        reference = FakeEmbeddingModel(
+            {text: rng.normal(size=EMBEDDING_DIMENSION) for text in texts}
+        )
+        close = FakeEmbeddingModel(
+            {
+                text: vector + rng.normal(scale=1e-4, size=EMBEDDING_DIMENSION)
+                for text, vector in reference.vectors.items()
+            }
+        )
+        drifted = FakeEmbeddingModel(
+            {
+                text: vector + rng.normal(scale=0.3, size=EMBEDDING_DIMENSION)
+                for text, vector in reference.vectors.items()
+            }
+        )
+
+        assert compare_embedding_models(reference, close, texts).passed
+        report = compare_embedding_models(reference, drifted, texts)
+        assert not report.passed
+        assert report.text_count == len(texts)
+
+    @pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+    def test_backend_parity_on_seeded_clauses(self, backend: str):
+        """Test real ONNX backends against PyTorch (needs onnxruntime and the model)."""
+        pytest.importorskip("onnxruntime")
+        if not isinstance(try_to_load_from_cache(MODEL_NAME, "config.json"), str):
+            pytest.skip("Embedding model is not in the local Hugging Face cache")
+
+        reference = load_embedding_model("torch")
+        candidate = load_embedding_model(backend)
+
+        report = compare_embedding_models(reference, candidate, seeded_clause_texts())
+
+        assert report.passed, report
+
+
+class TestFindSimilarClausesBatch:
+    """Tests for ClauseAnalysisService.find_similar_clauses_batch."""
+
+    async def test_results_follow_input_order(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        seeded_clauses: Dict[str, ProhibitedClause],
+    ):
+        """Test that each embedding row gets its own ranked matches."""
+        embeddings = np.stack(
+            [unit_vector(1), unit_vector(EMBEDDING_DIMENSION - 1), unit_vector(0)]
+        )
+
+        results = await analysis_service.find_similar_clauses_batch(
+            db_session, embeddings, threshold=0.5, limit=3
+        )
+
+        assert len(results) == 3
+        assert [(clause.id, round(score, 4)) for clause, score in results[0]] == [
+            (seeded_clauses["jurisdiction"].id, 1.0)
+        ]
+        assert results[1] == []
+        assert [clause.id for clause, _ in results[2]] == [seeded_clauses["penalty"].id]
+
+    async def test_limit_applies_per_embedding(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        seeded_clauses: Dict[str, ProhibitedClause],
+    ):
+        """Test that top-k is applied to each query vector separately."""
+        between = (unit_vector(0) * 0.8 + unit_vector(1) * 0.6).astype(np.float32)
+        embeddings = np.stack([between, between])
+
+        results = await analysis_service.find_similar_clauses_batch(
+            db_session, embeddings, threshold=0.0, limit=1
+        )
+
+        assert [[clause.id for clause, _ in row] for row in results] == [
+            [seeded_clauses["penalty"].id],
+            [seeded_clauses["penalty"].id],
+        ]
+
+    async def test_candidates_scoped_to_language_and_user(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        scoped_clauses: Dict[str, ProhibitedClause],
+    ):
+        """Test that only shared clauses of the language and the user's own are matched."""
+        query = unit_vector(0).reshape(1, -1)
+        owner_id = scoped_clauses["own"].user_id
+
+        polish = await analysis_service.find_similar_clauses_batch(
+            db_session, query, threshold=0.5, limit=5, language="pl", user_id=owner_id
+        )
+        english = await analysis_service.find_similar_clauses_batch(
+            db_session, query, threshold=0.5, limit=5, language="en"
+        )
+
+        assert {clause.id for clause, _ in polish[0]} == {
+            scoped_clauses["penalty"].id,
+            scoped_clauses["own"].id,
+        }
+        assert [clause.id for clause, _ in english[0]] == [scoped_clauses["english"].id]
+
+
+class TestLoadClauseDetails:
+    """Tests for ClauseAnalysisService.load_clause_details."""
+
+    async def test_cached_clauses_are_not_reloaded(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        statement_counter: List[str],
+    ):
+        """Test that the per-run cache short-circuits repeated lookups."""
+        clause_ids = {clause.id for clause in seeded_clauses.values()}
+
+        cache = await analysis_service.load_clause_details(db_session, clause_ids)
+        await analysis_service.load_clause_details(db_session, clause_ids, cache=cache)
+
+        assert len(statement_counter) == 1
+        assert set(cache) == clause_ids
+        assert cache[seeded_clauses["jurisdiction"].id].risk_level == "medium"
+
+
+class TestVectorIndex:
+    """Tests for the pgvector HNSW clause embedding index."""
+
+    async def test_index_recall_matches_exact_search(
+        self,
+        db_session: AsyncSession,
+        seeded_clauses: Dict[str, ProhibitedClause],
+    ):
+        """Test that the HNSW index returns the exact neighbours on a small corpus."""
+        status = await get_vector_index_status(db_session)
+        recall = await measure_vector_index_recall(db_session, limit=2, seed=0)
+
+        assert status["state"] == "ready"
+        assert status["method"] == "hnsw"
+        assert recall == 1.0
+
+
+class TestClauseEmbeddingIndex:
+    """Tests for the in-process ClauseEmbeddingIndex."""
+
+    async def test_matches_pgvector_results(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        mocker,
+    ):
+        """Test that the memory backend returns the same hits as pgvector."""
+        rng = np.random.default_rng(42)
+        category_id = seeded_clauses["penalty"].category_id
+        for i in range(40):
+            db_session.add(
+                ProhibitedClause(
+                    id=uuid4(),
+                    category_id=category_id,
+                    clause_text=f"Klauzula losowa {i}",
+                    normalized_text=f"klauzula losowa {i}",
+                    embedding=rng.normal(size=EMBEDDING_DIMENSION).tolist(),
+                    is_active=i % 10 != 0,
+                )
+            )
+        await db_session.commit()
+        queries = rng.normal(size=(6, EMBEDDING_DIMENSION)).astype(np.float32)
+
+        analysis_service.vector_backend = "pgvector"
+        expected = await analysis_service.find_similar_clauses_batch(
+            db_session, queries, threshold=0.0, limit=4
+        )
+        analysis_service.vector_backend = "memory"
+        index = await ClauseEmbeddingIndex.load(db_session)
+        mocker.patch("services.clause_index._clause_index", index)
+        actual = await analysis_service.find_similar_clauses_batch(
+            db_session, queries, threshold=0.0, limit=4
+        )
+
+        assert len(index) == 38
+        assert [[clause.id for clause, _ in row] for row in actual] == [
+            [clause.id for clause, _ in row] for row in expected
+        ]
+        for actual_row, expected_row in zip(actual, expected):
+            for (_, actual_score), (_, expected_score) in zip(actual_row, expected_row):
+                assert actual_score == pytest.approx(expected_score, abs=1e-5)
+
+    async def test_memory_backend_scopes_language_and_user(
+        self,
+        db_session: AsyncSession,
+        analysis_service: ClauseAnalysisService,
+        scoped_clauses: Dict[str, ProhibitedClause],
+        mocker,
+    ):
+        """Test that the memory backend applies the same candidate scope as pgvector."""
+        index = await ClauseEmbeddingIndex.load(db_session)
+        mocker.patch("services.clause_index._clause_index", index)
+        query = unit_vector(0).reshape(1, -1)
+        owner_id = scoped_clauses["own"].user_id
+
+        expected = await analysis_service.find_similar_clauses_batch(
+            db_session, query, threshold=0.5, limit=2, language="pl", user_id=owner_id
+        )
+        analysis_service.vector_backend = "memory"
+        actual = await analysis_service.find_similar_clauses_batch(
+            db_session, query, threshold=0.5, limit=2, language="pl", user_id=owner_id
+        )
+
+        assert len(index) == 5
+        assert index.candidate_rows() is not None
+        assert [clause.id for clause, _ in actual[0]] == [clause.id for clause, _ in expected[0]]
+        assert [clause.id for clause, _ in actual[0]] == [
+            scoped_clauses["penalty"].id,
+            scoped_clauses["own"].id,
+        ]
+
+    def test_search_ranks_and_filters(self):
+        """Test top-k ordering and threshold filtering."""
+        clause_ids = [uuid4() for _ in range(3)]
+        index = ClauseEmbeddingIndex.build(
+            clause_ids,
+            np.stack([unit_vector(0) * 2.0, unit_vector(1), unit_vector(2)]),
+        )
+        query = (unit_vector(0) * 0.8 + unit_vector(1) * 0.6).reshape(1, -1)
+
+        hits = index.search(query, threshold=0.5, limit=5)
+
+        assert [(row, clause_id) for row, clause_id, _ in hits] == [
+            (0, clause_ids[0]),
+            (0, clause_ids[1]),
+        ]
+        assert [round(score, 4) for _, _, score in hits] == [0.8, 0.6]
+        assert index.search(query, threshold=0.5, limit=1)[0][1] == clause_ids[0]
+
+    def test_empty_index(self):
+        """Test that an empty corpus yields no hits."""
+        index = ClauseEmbeddingIndex.build([], np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32))
+
+        assert index.search(unit_vector(0).reshape(1, -1), threshold=0.0, limit=3) == []
+
+    async def test_index_reloads_after_corpus_version_bump(
+        self,
+        db_session: AsyncSession,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        mocker,
+    ):
+        """Test that a cached index is rebuilt only when the corpus version changes."""
+        mocker.patch("services.clause_index._clause_index", None)
+
+        index = await get_clause_index(db_session)
+        assert await get_clause_index(db_session) is index
+        assert len(index) == 2
+
+        db_session.add(
+            ProhibitedClause(
+                id=uuid4(),
+                category_id=seeded_clauses["penalty"].category_id,
+                clause_text="Nowa klauzula",
+                normalized_text="nowa klauzula",
+                embedding=unit_vector(2).tolist(),
+            )
+        )
+        new_version = await bump_corpus_version(db_session)
+        await db_session.commit()
+
+        reloaded = await get_clause_index(db_session)
+        assert reloaded is not index
+        assert reloaded.version == new_version == index.version + 1
+        assert len(reloaded) == 3
+
+
+class TestClauseIndexSnapshot:
+    """Tests for memory-mapped clause index snapshots."""
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test that a reopened snapshot is memory-mapped and searches identically."""
+        clause_ids = [uuid4(), uuid4()]
+        index = ClauseEmbeddingIndex.build(
+            clause_ids,
+            np.stack([unit_vector(0), unit_vector(1)]),
+            clause_texts=[PENALTY_CLAUSE, "Umowa, umowa i UMOWA."],
+            version=7,
+        )
+
+        index.save_snapshot(tmp_path / "clause-index-v7")
+        reopened = ClauseEmbeddingIndex.open_snapshot(tmp_path / "clause-index-v7")
+
+        assert isinstance(reopened.embeddings, np.memmap)
+        assert reopened.version == 7
+        token_ids = reopened.clause_token_ids(clause_ids[1])
+        assert {reopened.vocabulary[token_id] for token_id in token_ids} == {"umowa", "i"}
+        assert reopened.token_lookup["umowa"] in token_ids
+        assert reopened.clause_token_ids(uuid4()) is None
+        query = unit_vector(1).reshape(1, -1)
+        assert reopened.search(query, 0.5, 3) == index.search(query, 0.5, 3)
+        assert reopened.search(query, 0.5, 3)[0][1] == clause_ids[1]
+
+    async def test_index_loaded_from_shared_snapshot(
+        self,
+        db_session: AsyncSession,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        tmp_path,
+        mocker,
+    ):
+        """Test that the first load publishes a snapshot and later loads reuse it."""
+        mocker.patch("services.clause_index.settings.analysis_index_snapshot_dir", str(tmp_path))
+        mocker.patch("services.clause_index._clause_index", None)
+        stale = tmp_path / "clause-index-v0"
+        stale.mkdir()
+        version = await bump_corpus_version(db_session)
+        await db_session.commit()
+
+        index = await get_clause_index(db_session)
+
+        assert snapshot_path(version).is_dir()
+        assert not stale.exists()
+        assert isinstance(index.embeddings, np.memmap)
+        assert len(index) == 2
+
+        load = mocker.spy(ClauseEmbeddingIndex, "load")
+        mocker.patch("services.clause_index._clause_index", None)
+        reopened = await get_clause_index(db_session)
+
+        load.assert_not_called()
+        assert reopened.version == version
+        assert {reopened.clause_id(row) for row in range(len(reopened))} == {
+            clause.id for clause in seeded_clauses.values()
+        }
+
+    async def test_snapshot_opened_under_shared_lock(
+        self,
+        db_session: AsyncSession,
+        seeded_clauses: Dict[str, ProhibitedClause],
+        tmp_path,
+        mocker,
+    ):
+        """Test that stale snapshot removal cannot run while a snapshot is being opened."""
+        mocker.patch("services.clause_index.settings.analysis_index_snapshot_dir", str(tmp_path))
+        mocker.patch("services.clause_index._clause_index", None)
+        await get_clause_index(db_session)
+        open_snapshot = ClauseEmbeddingIndex.open_snapshot
+        exclusive_lock_blocked = []
+
+        def open_while_removal_tries_to_lock(path):
+            with open(tmp_path / ".lock", "w") as other_process_lock:
+                try:
+                    fcntl.flock(other_process_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    exclusive_lock_blocked.append(True)
+            return open_snapshot(path)
+
+        mocker.patch.object(
+            ClauseEmbeddingIndex, "open_snapshot", side_effect=open_while_removal_tries_to_lock
+        )
+        mocker.patch("services.clause_index._clause_index", None)
+        await get_clause_index(db_session)
+
+        assert exclusive_lock_blocked == [True]
+
+    def test_analysis_imports_without_fcntl(self):
+        """Test that platforms without fcntl (Windows workers) can import the analysis service."""
+        script = "import sys; sys.modules['fcntl'] = None; import services.analysis"
+
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,212 @@
+"""Tests for database connection modes and read replica routing."""
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from sqlalchemy import literal, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from config import settings
+from database import connection
+from database.connection import (
+    get_connect_args,
+    get_db,
+    get_engine_options,
+    get_read_db,
+    replica_is_usable,
+)
+from services.vector_index import search_clause_embeddings
+from tests.conftest import TEST_DATABASE_URL
+
+# A transaction-mode PgBouncer to run the integration tests against, e.g. the
+# pgbouncer service of docker-compose.dev.yml (profile "pgbouncer")
+PGBOUNCER_TEST_DATABASE_URL = os.getenv("PGBOUNCER_TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pgbouncer_mode(mocker):
+    mocker.patch.object(settings, "database_pgbouncer", True)
+
+
+async def run_across_server_connections(connect_args: dict) -> None:
+    """
+    Run transactions on one client connection the way transaction pooling does.
+
+    Stand-in for PgBouncer: after every transaction the prepared statements are
+    dropped, as if the next transaction ran on another server connection.
+    """
+    engine = create_async_engine(
+        TEST_DATABASE_URL, pool_size=1, max_overflow=0, connect_args=connect_args
+    )
+    try:
+        for value in range(3):
+            async with engine.connect() as conn:
+                assert await conn.scalar(select(literal(value))) == value
+                await conn.commit()
+                await conn.exec_driver_sql("DEALLOCATE ALL")
+                await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+class TestEngineOptions:
+    """Tests for engine options of the direct and PgBouncer modes."""
+
+    def test_direct_mode_pools_locally(self):
+        """Test that direct connections are pooled, pre-pinged and tuned at startup."""
+        options = get_engine_options(pool_size=3, max_overflow=1)
+
+        assert options["pool_size"] == 3
+        assert options["max_overflow"] == 1
+        assert options["pool_pre_ping"] is True
+        assert "hnsw.ef_search" in options["connect_args"]["server_settings"]
+
+    def test_pgbouncer_mode(self, pgbouncer_mode):
+        """Test that PgBouncer mode leaves pooling to PgBouncer and caches no statements."""
+        options = get_engine_options(pool_size=3, max_overflow=1)
+        connect_args = options["connect_args"]
+
+        assert options["poolclass"] is NullPool
+        assert "pool_pre_ping" not in options
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert "server_settings" not in connect_args
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+class TestTransactionPoolingStandIn:
+    """Tests against a local stand-in for transaction-mode PgBouncer."""
+
+    async def test_direct_mode_breaks_on_server_connection_change(self):
+        """Test that cached prepared statements fail once the server connection changes."""
+        with pytest.raises(DBAPIError, match="prepared statement"):
+            await run_across_server_connections(get_connect_args())
+
+    async def test_pgbouncer_mode_survives_server_connection_change(self, pgbouncer_mode):
+        """Test that PgBouncer mode does not depend on statements prepared earlier."""
+        await run_across_server_connections(get_connect_args())
+
+    async def test_vector_search_sets_ef_search_per_transaction(
+        self, db_session: AsyncSession, pgbouncer_mode, mocker
+    ):
+        """Test that hnsw.ef_search is applied within the search transaction."""
+        mocker.patch.object(settings, "database_hnsw_ef_search", 77)
+
+        await search_clause_embeddings(
+            db_session, np.zeros((1, 384), dtype=np.float32), threshold=0.5, limit=5
+        )
+
+        assert (await db_session.scalar(text("SHOW hnsw.ef_search"))) == "77"
+
+
+class TestReadReplica:
+    """Tests for read replica routing."""
+
+    @pytest.fixture
+    async def replica(self, mocker):
+        """Use the test database as the replica (it reports no lag)."""
+        replica_engine = create_async_engine(TEST_DATABASE_URL)
+        mocker.patch.object(connection, "read_engine", replica_engine)
+        mocker.patch.object(
+            connection, "ReadSessionLocal", connection._create_session_factory(replica_engine)
+        )
+        mocker.patch.object(connection, "_replica_status", connection._ReplicaStatus())
+        yield replica_engine
+        await replica_engine.dispose()
+
+    async def read_session_bind(self):
+        sessions = get_read_db()
+        session = await sessions.__anext__()
+        await sessions.aclose()
+        return session.bind
+
+    async def test_reads_use_primary_without_replica(self):
+        """Test that reads go to the primary when no replica is configured."""
+        assert connection.read_engine is None
+        assert await self.read_session_bind() is connection.engine
+
+    async def test_reads_use_replica(self, replica):
+        """Test that reads go to a replica that keeps up."""
+        assert await self.read_session_bind() is replica
+
+    async def test_primary_and_replica_sessions_share_options(self, replica):
+        """Test that primary and replica sessions are configured alike."""
+        primary = dict(connection.AsyncSessionLocal.kw, bind=None)
+        read = dict(connection.ReadSessionLocal.kw, bind=None)
+
+        assert primary == read
+        assert primary["expire_on_commit"] is False
+
+    async def test_lagging_replica_falls_back_to_primary(self, replica, mocker):
+        """Test that reads go to the primary while the replica lags too much."""
+        mocker.patch.object(connection, "REPLICA_LAG_QUERY", text("SELECT 30.0"))
+
+        assert await self.read_session_bind() is connection.engine
+
+    async def test_unreachable_replica_falls_back_to_primary(self, mocker):
+        """Test that reads go to the primary when the replica cannot be reached."""
+        mocker.patch.object(
+            connection,
+            "read_engine",
+            create_async_engine("postgresql+asyncpg://nobody@/none?host=/nonexistent"),
+        )
+        mocker.patch.object(connection, "_replica_status", connection._ReplicaStatus())
+
+        assert await replica_is_usable() is False
+
+    async def test_lag_is_checked_once_per_interval(self, replica, mocker):
+        """Test that the lag check result is reused within the check interval."""
+        assert await replica_is_usable() is True
+        mocker.patch.object(connection, "REPLICA_LAG_QUERY", text("SELECT 30.0"))
+
+        assert await replica_is_usable() is True
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/v1/documents/{document_id}",
+            "/api/v1/jobs/{job_id}",
+            "/api/v1/jobs/{job_id}/events",
+        ],
+    )
+    def test_read_after_write_endpoints_use_primary(self, path):
+        """Test that endpoints polled right after an upload never read from the replica."""
+        from main import app
+
+        route = next(route for route in app.routes if getattr(route, "path", None) == path)
+        dependencies = {dependency.call for dependency in route.dependant.dependencies}
+
+        assert get_read_db not in dependencies
+        assert get_db in dependencies
+
+
+@pytest.mark.skipif(
+    not PGBOUNCER_TEST_DATABASE_URL, reason="PGBOUNCER_TEST_DATABASE_URL is not set"
+)
+class TestPgBouncerIntegration:
+    """Tests against a real transaction-mode PgBouncer."""
+
+    async def test_concurrent_sessions(self, pgbouncer_mode):
+        """Test many concurrent sessions, each running several transactions."""
+        engine = create_async_engine(
+            PGBOUNCER_TEST_DATABASE_URL, **get_engine_options(pool_size=1, max_overflow=0)
+        )
+
+        async def run_session(value: int) -> int:
+            async with AsyncSession(engine) as session:
+                total = 0
+                for _ in range(3):
+                    total += await session.scalar(select(literal(value)))
+                    await session.commit()
+                return total
+
+        try:
+            results = await asyncio.gather(*(run_session(value) for value in range(50)))
+        finally:
+            await engine.dispose()
+
+        assert results == [value * 3 for value in range(50)]
@@ -1,14 +1,61 @@
 """Tests for document API endpoints."""
+from datetime import datetime
 from io import BytesIO
-from uuid import uuid4
+from uuid import UUID, uuid4
 
+import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import settings
+from models.analysis import Analysis, FlaggedClause
 from models.document import Document
 from models.user import User
+from services.clause_corpus import bump_corpus_version
+from services.result_cache import RESULT_CACHE_OPTION, build_result_cache_key
 from tests.conftest import auth_headers
 
 
+async def _create_analyzed_document(db_session: AsyncSession, sha256_hash: str) -> Analysis:
+    """Create a document with a completed analysis and one flagged clause."""
+    document = Document(
+        id=uuid4(),
+        filename="original.pdf",
+        original_filename="original.pdf",
+        size_bytes=1024,
+        mime_type="application/pdf",
+        language="pl",
+        status="completed",
+        upload_url="http://storage/original.pdf",
+        sha256_hash=sha256_hash,
+    )
+    db_session.add(document)
+    cache_key = await build_result_cache_key(db_session, None)
+    analysis = Analysis(
+        document_id=document.id,
+        language="pl",
+        status="completed",
+        options={RESULT_CACHE_OPTION: cache_key},
+        total_clauses_found=1,
+        high_risk_count=1,
+        risk_score=10,
+        completed_at=datetime.utcnow(),
+    )
+    db_session.add(analysis)
+    await db_session.flush()
+    db_session.add(
+        FlaggedClause(
+            analysis_id=analysis.id,
+            matched_text="Kara umowna 50%.",
+            confidence=0.95,
+            risk_level="high",
+        )
+    )
+    await db_session.commit()
+    return analysis
+
+
 class TestDocumentHealth:
     """Tests for GET /api/v1/documents/health endpoint."""
 
@@ -101,6 +148,118 @@ class TestUploadDocument:
         data = response.json()
         assert "document_id" in data
 
+    async def test_upload_reuses_analysis_of_identical_file(
+        self, client: AsyncClient, db_session, mocker
+    ):
+        """Test that an already analyzed file is not processed again."""
+        analyzed = await _create_analyzed_document(db_session, "same-hash")
+        mocker.patch(
+            "api.documents.storage_service.upload_file",
+            return_value=("copy.pdf", "same-hash", 1024),
+        )
+        mocker.patch(
+            "api.documents.storage_service.get_file_url",
+            return_value="http://storage/copy.pdf",
+        )
+        delay = mocker.patch("tasks.document_processing.process_document.delay")
+
+        response = await client.post(
+            "/api/v1/documents/upload",
+            files={"file": ("copy.pdf", BytesIO(b"%PDF-1.4 same"), "application/pdf")},
+            data={"language": "pl"},
+        )
+
+        assert response.status_code == 200
+        delay.assert_not_called()
+        document_id = UUID(response.json()["document_id"])
+        result = await db_session.execute(
+            select(Analysis).where(Analysis.document_id == document_id)
+        )
+        cloned = result.scalar_one()
+        assert response.json()["analysis_id"] == str(cloned.id)
+        assert cloned.options["cloned_from"] == str(analyzed.id)
+        assert cloned.high_risk_count == 1
+        flagged = await db_session.execute(
+            select(FlaggedClause).where(FlaggedClause.analysis_id == cloned.id)
+        )
+        assert [clause.matched_text for clause in flagged.scalars()] == ["Kara umowna 50%."]
+        document = await db_session.get(Document, document_id)
+        assert document.status == "completed"
+        assert document.celery_task_id is None
+
+    async def test_upload_after_corpus_change_is_processed(
+        self, client: AsyncClient, db_session, mocker
+    ):
+        """Test that results from an older clause corpus are not reused."""
+        await _create_analyzed_document(db_session, "same-hash")
+        await bump_corpus_version(db_session)
+        await db_session.commit()
+        mocker.patch(
+            "api.documents.storage_service.upload_file",
+            return_value=("copy.pdf", "same-hash", 1024),
+        )
+        mocker.patch(
+            "api.documents.storage_service.get_file_url",
+            return_value="http://storage/copy.pdf",
+        )
+        mock_task = mocker.MagicMock()
+        mock_task.id = "task-456"
+        delay = mocker.patch(
+            "tasks.document_processing.process_document.delay",
+            return_value=mock_task,
+        )
+
+        response = await client.post(
+            "/api/v1/documents/upload",
+            files={"file": ("copy.pdf", BytesIO(b"%PDF-1.4 same"), "application/pdf")},
+            data={"language": "pl"},
+        )
+
+        assert response.status_code == 200
+        delay.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "changed_input", ["reordered_thresholds", "embedding_backend", "embedding_model"]
+    )
+    async def test_upload_with_other_inputs_is_processed(
+        self, client: AsyncClient, db_session, mocker, changed_input: str
+    ):
+        """Test that results are only reused for the same thresholds and embeddings."""
+        await _create_analyzed_document(db_session, "same-hash")
+        if changed_input == "reordered_thresholds":
+            # The same values, assigned to other risk levels
+            low, high = settings.analysis_threshold_low, settings.analysis_threshold_high
+            mocker.patch.object(settings, "analysis_threshold_low", high)
+            mocker.patch.object(settings, "analysis_threshold_high", low)
+        elif changed_input == "embedding_backend":
+            mocker.patch.object(settings, "analysis_embedding_backend", "onnx-int8")
+        else:
+            mocker.patch("services.result_cache.MODEL_NAME", "sentence-transformers/LaBSE")
+        mocker.patch(
+            "api.documents.storage_service.upload_file",
+            return_value=("copy.pdf", "same-hash", 1024),
+        )
+        mocker.patch(
+            "api.documents.storage_service.get_file_url",
+            return_value="http://storage/copy.pdf",
+        )
+        mock_task = mocker.MagicMock()
+        mock_task.id = "task-789"
+        delay = mocker.patch(
+            "tasks.document_processing.process_document.delay",
+            return_value=mock_task,
+        )
+
+        response = await client.post(
+            "/api/v1/documents/upload",
+            files={"file": ("copy.pdf", BytesIO(b"%PDF-1.4 same"), "application/pdf")},
+            data={"language": "pl"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["analysis_id"] is None
+        delay.assert_called_once()
+
     async def test_upload_invalid_file_type(self, client: AsyncClient):
         """Test uploading file with invalid type fails."""
         # Create test file with invalid type
@@ -0,0 +1,109 @@
+"""Tests for the shared embedding service."""
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from services.embedding_service import (
+    DynamicBatcher,
+    EmbeddingServiceClient,
+    EmbeddingServiceError,
+    parse_address,
+    serve,
+)
+
+
+class RecordingModel:
+    """Embedding model stand-in that records the size of every encode call."""
+
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True):
+        if any(text == "fail" for text in texts):
+            raise ValueError("cannot encode")
+        self.batch_sizes.append(len(texts))
+        embeddings = np.zeros((len(texts), 384), dtype=np.float32)
+        embeddings[:, 0] = [len(text) for text in texts]
+        return embeddings
+
+
+class TestDynamicBatcher:
+    """Tests for DynamicBatcher."""
+
+    async def test_concurrent_requests_share_one_batch(self):
+        """Test that requests arriving within max_wait are encoded together."""
+        model = RecordingModel()
+        batcher = DynamicBatcher(model, max_batch=64, max_wait=0.05)
+        batcher.start()
+        try:
+            results = await asyncio.gather(
+                batcher.encode(["a", "bb"]),
+                batcher.encode(["ccc"]),
+                batcher.encode(["dddd", "eeeee"]),
+            )
+        finally:
+            await batcher.stop()
+
+        assert model.batch_sizes == [5]
+        assert [result[:, 0].tolist() for result in results] == [[1, 2], [3], [4, 5]]
+
+    async def test_full_batch_is_dispatched_without_waiting(self):
+        """Test that max_batch caps the merged batch size."""
+        model = RecordingModel()
+        batcher = DynamicBatcher(model, max_batch=2, max_wait=10.0)
+        batcher.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(batcher.encode(["a", "b"]), batcher.encode(["c", "d"])),
+                timeout=5,
+            )
+        finally:
+            await batcher.stop()
+
+        assert model.batch_sizes == [2, 2]
+
+
+class TestEmbeddingServiceClient:
+    """Tests for the socket server and blocking client."""
+
+    async def test_client_round_trip(self, tmp_path):
+        """Test encoding through a unix socket, including errors and single texts."""
+        model = RecordingModel()
+        address = f"unix://{tmp_path / 'embedding.sock'}"
+        server = asyncio.create_task(serve(address, model, max_batch=32, max_wait=0.01))
+        while not (tmp_path / "embedding.sock").exists():
+            await asyncio.sleep(0.01)
+
+        client = EmbeddingServiceClient(address, timeout=5)
+        try:
+            matrix = await asyncio.to_thread(client.encode, ["one", "three"])
+            vector = await asyncio.to_thread(client.encode, "four")
+            with pytest.raises(EmbeddingServiceError, match="cannot encode"):
+                await asyncio.to_thread(client.encode, ["fail"])
+            after_error = await asyncio.to_thread(client.encode, ["x"])
+        finally:
+            client.close()
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+
+        assert matrix.shape == (2, 384)
+        assert matrix[:, 0].tolist() == [3, 5]
+        assert vector.shape == (384,)
+        assert vector[0] == 4
+        assert after_error[0, 0] == 1
+
+    def test_unreachable_service(self, tmp_path):
+        """Test that a missing service raises EmbeddingServiceError."""
+        client = EmbeddingServiceClient(f"unix://{tmp_path / 'missing.sock'}", timeout=1)
+
+        with pytest.raises(EmbeddingServiceError):
+            client.encode(["text"])
+
+    def test_parse_address(self):
+        """Test unix and tcp address parsing."""
+        assert parse_address("unix:///run/embed.sock") == ("unix", "/run/embed.sock")
+        assert parse_address("tcp://embedder:7070") == ("tcp", ("embedder", 7070))
+        with pytest.raises(ValueError):
+            parse_address("embedder:7070")
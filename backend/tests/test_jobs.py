@@ -0,0 +1,243 @@
+"""Tests for job status endpoints and job progress events."""
+import json
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from redis import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.document import Document
+from services import job_status_cache
+from services.job_events import job_channel, publish_job_event
+from services.job_status_cache import invalidate_job_status, job_status_key
+
+
+class FakeSubscription:
+    """Job event subscription replaying a fixed list of events."""
+
+    def __init__(self, events: List[dict]) -> None:
+        self.events = list(events)
+        self.closed = False
+
+    async def next_event(self, timeout: float) -> Optional[dict]:
+        return self.events.pop(0) if self.events else None
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def parse_events(body: str) -> List[dict]:
+    """Get the data of all status events of a Server-Sent Events body."""
+    return [
+        json.loads(line[len("data: ") :])
+        for block in body.split("\n\n")
+        for line in block.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+async def _create_document(db_session: AsyncSession, job_id: str, status: str) -> Document:
+    document = Document(
+        id=uuid4(),
+        filename="contract.pdf",
+        original_filename="contract.pdf",
+        size_bytes=1024,
+        mime_type="application/pdf",
+        language="pl",
+        status=status,
+        upload_url="http://storage/contract.pdf",
+        celery_task_id=job_id,
+    )
+    db_session.add(document)
+    await db_session.commit()
+    return document
+
+
+@pytest.fixture(autouse=True)
+def status_cache(mocker):
+    """Replace the Redis job status cache with a dict."""
+    cache = {}
+
+    async def get_cached(job_id):
+        return cache.get(job_id)
+
+    async def store(job_id, status):
+        cache[job_id] = status
+
+    mocker.patch("api.jobs.get_cached_job_status", side_effect=get_cached)
+    mocker.patch("api.jobs.cache_job_status", side_effect=store)
+    return cache
+
+
+class TestGetJobStatus:
+    """Tests for GET /api/v1/jobs/{job_id} endpoint."""
+
+    async def test_finished_status_is_cached(
+        self, client: AsyncClient, db_session: AsyncSession, status_cache: dict
+    ):
+        """Test that a completed job's status is cached and then served from the cache."""
+        document = await _create_document(db_session, "job-done", "completed")
+
+        response = await client.get("/api/v1/jobs/job-done")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert status_cache["job-done"] == response.json()
+
+        await db_session.delete(document)
+        await db_session.commit()
+        cached = await client.get("/api/v1/jobs/job-done")
+        assert cached.json() == response.json()
+
+    async def test_running_status_is_not_cached(
+        self, client: AsyncClient, db_session: AsyncSession, status_cache: dict
+    ):
+        """Test that statuses which can still change are always read fresh."""
+        await _create_document(db_session, "job-running", "uploaded")
+
+        response = await client.get("/api/v1/jobs/job-running")
+
+        assert response.json()["status"] == "queued"
+        assert status_cache == {}
+
+
+class TestJobStatusCache:
+    """Tests for the Redis job status cache."""
+
+    def test_worker_invalidates_status(self, mocker):
+        """Test that invalidation deletes the job's key."""
+        invalidator = mocker.patch.object(job_status_cache, "_invalidator")
+
+        invalidate_job_status("job-1")
+
+        invalidator.delete.assert_called_once_with(job_status_key("job-1"))
+
+    async def test_unavailable_redis_is_skipped(self, mocker):
+        """Test that a Redis error disables the cache for a while instead of failing."""
+        client = mocker.AsyncMock()
+        client.get.side_effect = RedisError("down")
+        mocker.patch.object(job_status_cache, "_client", client)
+        mocker.patch.object(job_status_cache, "_redis_retry_at", 0.0)
+
+        assert await job_status_cache.get_cached_job_status("job-1") is None
+        assert await job_status_cache.get_cached_job_status("job-1") is None
+        assert client.get.await_count == 1
+
+
+class TestStreamJobStatus:
+    """Tests for GET /api/v1/jobs/{job_id}/events endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def celery_result(self, mocker):
+        result = mocker.patch("api.jobs.AsyncResult").return_value
+        result.state = "PROCESSING"
+        result.info = {"stage": "parsing"}
+
+    async def test_streams_transitions_until_completed(
+        self, client: AsyncClient, db_session: AsyncSession, mocker
+    ):
+        """Test that the current status is followed by published transitions."""
+        await _create_document(db_session, "job-1", "processing")
+        subscription = FakeSubscription(
+            [
+                {"job_id": "job-1", "status": "processing", "meta": {"stage": "analyzing"}},
+                {"job_id": "job-1", "status": "completed", "result": {"pages": 2}},
+                {"job_id": "job-1", "status": "processing", "meta": {"stage": "late"}},
+            ]
+        )
+        mocker.patch("api.jobs.subscribe_job_events", return_value=subscription)
+
+        response = await client.get("/api/v1/jobs/job-1/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        assert [event["status"] for event in events] == ["processing", "processing", "completed"]
+        assert events[0]["meta"] == {"stage": "parsing"}
+        assert events[1]["meta"] == {"stage": "analyzing"}
+        assert subscription.closed
+
+    async def test_finished_job_sends_status_only(
+        self, client: AsyncClient, db_session: AsyncSession, mocker
+    ):
+        """Test that a finished job's stream ends after the current status."""
+        await _create_document(db_session, "job-2", "failed")
+        subscription = FakeSubscription([{"job_id": "job-2", "status": "processing"}])
+        mocker.patch("api.jobs.subscribe_job_events", return_value=subscription)
+
+        response = await client.get("/api/v1/jobs/job-2/events")
+
+        assert [event["status"] for event in parse_events(response.text)] == ["failed"]
+        assert subscription.closed
+
+    async def test_lost_final_event_ends_stream_on_heartbeat(
+        self, client: AsyncClient, db_session: AsyncSession, mocker
+    ):
+        """Test that the status is re-checked on a heartbeat, so a lost event can't hang it."""
+        document = await _create_document(db_session, "job-4", "processing")
+        # The job completes, but its event never arrives; only a later one would
+        subscription = FakeSubscription([None, {"job_id": "job-4", "status": "failed"}])
+        next_event = subscription.next_event
+
+        async def complete_silently(timeout: float) -> Optional[dict]:
+            document.status = "completed"
+            await db_session.commit()
+            return await next_event(timeout)
+
+        subscription.next_event = complete_silently
+        mocker.patch("api.jobs.subscribe_job_events", return_value=subscription)
+
+        @asynccontextmanager
+        async def db_context():
+            yield db_session
+
+        mocker.patch("api.jobs.get_db_context", db_context)
+
+        response = await client.get("/api/v1/jobs/job-4/events")
+
+        events = parse_events(response.text)
+        assert [event["status"] for event in events] == ["processing", "completed"]
+        assert events[1]["result"]["document_id"] == str(document.id)
+        assert subscription.closed
+
+    async def test_without_redis_sends_status_only(
+        self, client: AsyncClient, db_session: AsyncSession, mocker
+    ):
+        """Test that the stream degrades to the current status when Redis is down."""
+        await _create_document(db_session, "job-3", "processing")
+        mocker.patch("api.jobs.subscribe_job_events", side_effect=RedisError("down"))
+
+        response = await client.get("/api/v1/jobs/job-3/events")
+
+        assert response.status_code == 200
+        assert [event["status"] for event in parse_events(response.text)] == ["processing"]
+
+
+class TestPublishJobEvent:
+    """Tests for publish_job_event."""
+
+    def test_publishes_to_job_channel(self, mocker):
+        """Test that events are published as JSON on the job's channel."""
+        publisher = mocker.patch("services.job_events._get_publisher").return_value
+
+        publish_job_event("job-1", "processing", stage="parsing")
+
+        channel, payload = publisher.publish.call_args.args
+        assert channel == job_channel("job-1")
+        assert json.loads(payload) == {
+            "job_id": "job-1",
+            "status": "processing",
+            "result": None,
+            "error": None,
+            "meta": {"stage": "parsing"},
+        }
+
+    def test_redis_errors_are_ignored(self, mocker):
+        """Test that a failed publish does not raise."""
+        publisher = mocker.patch("services.job_events._get_publisher").return_value
+        publisher.publish.side_effect = RedisError("down")
+
+        publish_job_event("job-1", "failed", error="Document processing failed")
@@ -0,0 +1,253 @@
+"""Tests for the OCR service."""
+import io
+import threading
+import time
+from typing import List
+
+import pytest
+from PIL import Image
+
+from services.ocr import OCRResult, OCRService, _read_tesseract_data
+
+
+def page_image(page: int) -> Image.Image:
+    """Create a page image whose width identifies the page."""
+    return Image.new("L", (100 + page, 50), color=255)
+
+
+def tesseract_data(paragraphs: List[List[str]], conf: float = 90.0) -> dict:
+    """Build image_to_data output for paragraphs of lines (word boxes 10 px apart)."""
+    keys = ["level", "page_num", "block_num", "par_num", "line_num", "word_num"]
+    keys += ["left", "top", "width", "height", "conf", "text"]
+    data: dict = {key: [] for key in keys}
+
+    def add(level, par_num, line_num, word_num, text, conf, left=0, top=0):
+        values = [level, 1, 1, par_num, line_num, word_num, left, top, 8, 8, conf, text]
+        for key, value in zip(keys, values):
+            data[key].append(value)
+
+    for par_num, lines in enumerate(paragraphs, start=1):
+        add(3, par_num, 0, 0, "", -1)
+        for line_num, line in enumerate(lines, start=1):
+            add(4, par_num, line_num, 0, "", -1)
+            for word_num, word in enumerate(line.split(), start=1):
+                add(5, par_num, line_num, word_num, word, conf, 10 * word_num, 10 * line_num)
+    return data
+
+
+@pytest.fixture
+def tesseract(mocker):
+    """Replace Tesseract with a fake that "reads" the page number from the image width."""
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def image_to_data(image, lang, config, output_type):
+        page = image.width - 100
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        # Earlier pages take longer, so pages finish out of order
+        time.sleep(max(0.0, 0.01 * (5 - page)))
+        with lock:
+            active["now"] -= 1
+        return tesseract_data([[f"page {page}"]])
+
+    mocker.patch("services.ocr.pytesseract.image_to_data", side_effect=image_to_data)
+    return active
+
+
+@pytest.fixture
+def scan_pdf(tmp_path) -> str:
+    """Create a 5-page PDF without a text layer."""
+    import fitz  # PyMuPDF
+
+    path = tmp_path / "scan.pdf"
+    with fitz.open() as doc:
+        for _ in range(5):
+            doc.new_page(width=72, height=36)
+        doc.save(path)
+    return str(path)
+
+
+class TestExtractFromPdfPages:
+    """Tests for OCRService.extract_from_pdf_pages."""
+
+    @pytest.fixture
+    def pages(self, tesseract, mocker):
+        """Render each page as a page_image and count images not yet OCR-ed."""
+        rendered = {"live": 0, "peak": 0}
+        ocr_image = OCRService.ocr_image
+
+        def render_page(self, page, dpi=300):
+            rendered["live"] += 1
+            rendered["peak"] = max(rendered["peak"], rendered["live"])
+            return page_image(page.number)
+
+        def ocr_and_release(self, image, language="pol", preprocess=True):
+            result = ocr_image(self, image, language=language, preprocess=preprocess)
+            rendered["live"] -= 1
+            return result
+
+        mocker.patch.object(OCRService, "render_page", render_page)
+        mocker.patch.object(OCRService, "ocr_image", ocr_and_release)
+        mocker.patch.object(OCRService, "preprocess_image", side_effect=lambda image: image)
+        return rendered
+
+    def test_pages_are_ocred_concurrently_in_order(self, tesseract, pages, scan_pdf, mocker):
+        """Test that pages are OCR-ed in parallel and joined in page order."""
+        mocker.patch("services.ocr.settings.ocr_workers", 3)
+
+        result = OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert result.text == "\n\n".join(f"page {page}" for page in range(5))
+        assert result.confidence == pytest.approx(0.9)
+        assert [word.page_number for word in result.words[:4]] == [0, 0, 1, 1]
+        assert 1 < tesseract["peak"] <= 3
+
+    def test_page_images_are_bounded(self, pages, scan_pdf, mocker):
+        """Test that pages are rendered lazily, never more than OCR_WORKERS at once."""
+        mocker.patch("services.ocr.settings.ocr_workers", 2)
+
+        OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert pages["peak"] <= 2
+        assert pages["live"] == 0
+
+    def test_single_worker_runs_sequentially(self, tesseract, pages, scan_pdf, mocker):
+        """Test that OCR_WORKERS=1 keeps the sequential behavior."""
+        mocker.patch("services.ocr.settings.ocr_workers", 1)
+
+        result = OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert result.text.startswith("page 0\n\npage 1")
+        assert tesseract["peak"] == 1
+        assert pages["peak"] == 1
+
+
+class TestOcrImage:
+    """Tests for OCRService.ocr_image."""
+
+    def test_single_tesseract_pass(self, mocker):
+        """Test that text, confidence and word boxes come from one image_to_data call."""
+        image_to_data = mocker.patch(
+            "services.ocr.pytesseract.image_to_data",
+            return_value=tesseract_data([["Umowa najmu", "lokalu"], ["§ 1"]], conf=80.0),
+        )
+        image_to_string = mocker.patch("services.ocr.pytesseract.image_to_string")
+
+        result = OCRService().ocr_image(page_image(0))
+
+        image_to_data.assert_called_once()
+        image_to_string.assert_not_called()
+        assert result.text == "Umowa najmu\nlokalu\n\n§ 1"
+        assert result.confidence == pytest.approx(0.8)
+        assert [word.text for word in result.words] == ["Umowa", "najmu", "lokalu", "§", "1"]
+        assert (result.words[1].left, result.words[1].top) == (20, 10)
+
+    def test_tesseract_5_float_confidences(self):
+        """Test that fractional confidences are accepted."""
+        data = tesseract_data([["Strony umowy"]], conf=96.5)
+        data["conf"] = [str(conf) for conf in data["conf"]]
+
+        text, words = _read_tesseract_data(data)
+
+        assert text == "Strony umowy"
+        assert words[0].confidence == pytest.approx(0.965)
+
+
+class TestRenderPage:
+    """Tests for OCRService.render_page."""
+
+    def test_renders_grayscale_at_dpi(self, scan_pdf):
+        """Test that pages become grayscale images of the requested resolution."""
+        import fitz  # PyMuPDF
+
+        with fitz.open(scan_pdf) as doc:
+            image = OCRService().render_page(doc[0], dpi=144)
+
+        assert image.mode == "L"
+        assert image.size == (144, 72)
+
+    def test_images_are_not_reencoded(self, tesseract, scan_pdf, mocker):
+        """Test that page images go to Tesseract without a PNG round-trip."""
+        save = mocker.spy(Image.Image, "save")
+
+        result = OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert result.success
+        save.assert_not_called()
+
+
+class TestAdaptiveOcr:
+    """Tests for the adaptive OCR pipeline."""
+
+    @pytest.fixture
+    def passes(self, mocker):
+        """Record the passes run; page 1 is only readable with the full pass."""
+        calls = []
+
+        def render_page(self, page, dpi=None):
+            calls.append(("render", page.number, dpi))
+            return page_image(page.number)
+
+        def ocr_image(self, image, language="pol", preprocess=True):
+            page = image.width - 100
+            calls.append(("ocr", page, preprocess))
+            confidence = 0.5 if page == 1 and not preprocess else 0.95
+            return OCRResult(
+                text=f"page {page}", confidence=confidence, preprocessing_applied=preprocess
+            )
+
+        mocker.patch.object(OCRService, "render_page", render_page)
+        mocker.patch.object(OCRService, "ocr_image", ocr_image)
+        mocker.patch("services.ocr.settings.ocr_fast_dpi", 150)
+        mocker.patch("services.ocr.settings.ocr_dpi", 300)
+        mocker.patch("services.ocr.settings.ocr_min_confidence", 0.8)
+        return calls
+
+    def test_only_low_confidence_pages_are_escalated(self, passes, scan_pdf):
+        """Test that pages get the fast pass and only unclear ones the full pass."""
+        result = OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert [call[2] for call in passes if call[0] == "render"] == [150] * 5 + [300]
+        assert ("ocr", 1, True) in passes
+        assert [
+            (page.dpi, page.preprocessing_applied, page.escalated) for page in result.pages
+        ] == [
+            (150, False, False),
+            (300, True, True),
+            (150, False, False),
+            (150, False, False),
+            (150, False, False),
+        ]
+        assert result.confidence == pytest.approx(0.95)
+
+    def test_adaptive_ocr_can_be_disabled(self, passes, scan_pdf, mocker):
+        """Test that OCR_ADAPTIVE=false always runs the full pass."""
+        mocker.patch("services.ocr.settings.ocr_adaptive", False)
+
+        result = OCRService().extract_from_pdf_pages(scan_pdf)
+
+        assert {call[2] for call in passes} == {300, True}
+        assert not any(page.escalated for page in result.pages)
+
+    def test_clean_image_skips_preprocessing(self, passes):
+        """Test that a confident image is not preprocessed and OCR-ed again."""
+        buffer = io.BytesIO()
+        page_image(0).save(buffer, format="PNG")
+
+        result = OCRService().extract_text_from_image(buffer.getvalue())
+
+        assert [call[2] for call in passes] == [False]
+        assert not result.preprocessing_applied
+
+    def test_unclear_image_is_preprocessed(self, passes):
+        """Test that an image below the confidence threshold is preprocessed."""
+        buffer = io.BytesIO()
+        page_image(1).save(buffer, format="PNG")
+
+        result = OCRService().extract_text_from_image(buffer.getvalue())
+
+        assert [call[2] for call in passes] == [False, True]
+        assert result.escalated
+        assert result.confidence == pytest.approx(0.95)
@@ -0,0 +1,139 @@
+"""Tests for document parsing."""
+import io
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import fitz  # PyMuPDF
+import pytest
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.document import Document, DocumentMetadata
+from services.analysis import AnalysisResult
+from services.ocr import OCRResult
+from services.parser import document_parser
+from tasks.document_processing import _store_metadata_and_analyze
+
+NATIVE_TEXT = "Najemca zobowiazuje sie do zaplaty czynszu do dnia 10 kazdego miesiaca."
+
+
+def scanned_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("L", (200, 100), color=255).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path) -> str:
+    """Create a PDF of native pages, a scanned annex page, a blank page and a signature page."""
+    path = tmp_path / "contract.pdf"
+    with fitz.open() as doc:
+        for _ in range(3):
+            doc.new_page().insert_text((72, 72), NATIVE_TEXT)
+        doc.new_page().insert_image(fitz.Rect(0, 0, 200, 100), stream=scanned_image())
+        doc.new_page()
+        doc.new_page().insert_text((72, 72), "Podpisy stron")
+        doc.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def ocr_image(mocker):
+    """Replace page OCR with a fixed annex text."""
+    return mocker.patch(
+        "services.parser.ocr_service.ocr_image",
+        return_value=OCRResult(text="Aneks nr 1 do umowy najmu", confidence=0.9),
+    )
+
+
+class TestParsePdf:
+    """Tests for DocumentParser.parse_pdf."""
+
+    def test_only_scanned_pages_are_ocred(self, mixed_pdf, ocr_image):
+        """Test that native pages keep their text and only the scanned page is OCR-ed."""
+        parsed = document_parser.parse_pdf(mixed_pdf)
+
+        ocr_image.assert_called_once()
+        assert parsed.pages == 6
+        assert [page["page"] for page in parsed.metadata["ocr_pages"]] == [4]
+        assert parsed.ocr_result.confidence == pytest.approx(0.9)
+        assert [section.page_number for section in parsed.sections] == [1, 2, 3, 4, 6]
+        assert parsed.sections[3].content == "Aneks nr 1 do umowy najmu"
+        assert NATIVE_TEXT in parsed.sections[0].content
+
+    def test_section_positions_match_full_text(self, mixed_pdf, ocr_image):
+        """Test that section positions point at their content in the full text."""
+        parsed = document_parser.parse_pdf(mixed_pdf)
+
+        for section in parsed.sections:
+            assert parsed.full_text[section.start_position : section.end_position] == (
+                section.content
+            )
+
+    def test_native_pdf_skips_ocr(self, tmp_path, ocr_image):
+        """Test that a PDF with a text layer on every page is not OCR-ed."""
+        path = str(tmp_path / "native.pdf")
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), NATIVE_TEXT)
+            doc.save(path)
+
+        parsed = document_parser.parse_pdf(path)
+
+        ocr_image.assert_not_called()
+        assert parsed.ocr_result is None
+        assert "ocr_pages" not in parsed.metadata
+
+
+class TestStoreParsedDocument:
+    """Tests for storing a parsed document in the processing task."""
+
+    async def test_ocr_page_report_is_stored(
+        self, mixed_pdf, ocr_image, db_session: AsyncSession, mocker
+    ):
+        """Test that the per-page OCR report of a scanned PDF is kept with its metadata."""
+        document = Document(
+            id=uuid4(),
+            filename="contract.pdf",
+            original_filename="contract.pdf",
+            size_bytes=1024,
+            mime_type="application/pdf",
+            language="pl",
+            status="processing",
+            upload_url="http://storage/contract.pdf",
+        )
+        db_session.add(document)
+        await db_session.commit()
+
+        @asynccontextmanager
+        async def celery_db_context():
+            yield db_session
+
+        mocker.patch("database.connection.get_celery_db_context", celery_db_context)
+        service = mocker.patch("services.analysis.get_analysis_service").return_value
+        service.analyze_document = mocker.AsyncMock(
+            return_value=AnalysisResult(
+                matches=[],
+                total_segments_analyzed=5,
+                high_risk_count=0,
+                medium_risk_count=0,
+                low_risk_count=0,
+                risk_score=0,
+            )
+        )
+
+        parsed = document_parser.parse_pdf(mixed_pdf)
+        await _store_metadata_and_analyze(str(document.id), parsed, "pl")
+
+        metadata = await db_session.scalar(
+            select(DocumentMetadata).where(DocumentMetadata.document_id == document.id)
+        )
+        assert metadata.ocr_pages == parsed.metadata["ocr_pages"]
+        assert [page["page"] for page in metadata.ocr_pages] == [4]
+        assert set(metadata.ocr_pages[0]) == {
+            "page",
+            "dpi",
+            "preprocessed",
+            "escalated",
+            "confidence",
+        }
@@ -0,0 +1,87 @@
+"""Import-time checks that keep the API process free of worker dependencies."""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+from services.storage import StorageService
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Inference, parsing and OCR stacks only Celery workers need
+WORKER_ONLY_MODULES = {
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "onnxruntime",
+    "optimum",
+    "fitz",
+    "docx",
+    "pytesseract",
+    "cv2",
+}
+
+# Modules the API imports lazily inside request handlers
+API_LAZY_MODULES = ["tasks.document_processing", "tasks.sync", "services.vector_index"]
+
+
+def imported_top_level_modules(code: str) -> Set[str]:
+    """Run code in a fresh interpreter with -X importtime and list top-level modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+
+class TestImportTime:
+    """Tests for what the API process imports."""
+
+    def test_api_does_not_import_worker_dependencies(self):
+        """Test that the app and its lazily imported modules skip torch, PyMuPDF and OCR."""
+        modules = imported_top_level_modules(
+            "import main; " + "; ".join(f"import {name}" for name in API_LAZY_MODULES)
+        )
+
+        assert "main" in modules
+        assert modules & WORKER_ONLY_MODULES == set()
+
+    def test_app_import_does_not_load_minio(self):
+        """Test that MinIO is only imported once storage is first used."""
+        modules = imported_top_level_modules("import main")
+
+        assert "minio" not in modules
+
+
+class TestStorageService:
+    """Tests for lazy MinIO initialization."""
+
+    def test_connects_on_first_use(self, mocker):
+        """Test that the client is created once, on first access."""
+        minio = mocker.patch("minio.Minio")
+        minio.return_value.bucket_exists.return_value = True
+
+        service = StorageService()
+        minio.assert_not_called()
+
+        assert service.client is minio.return_value
+        assert service.client is minio.return_value
+        minio.assert_called_once()
+
+    def test_unavailable_minio(self, mocker):
+        """Test that a failed connection leaves the client unset."""
+        mocker.patch("minio.Minio", side_effect=ValueError("unreachable"))
+
+        service = StorageService()
+
+        assert service.client is None
@@ -0,0 +1,196 @@
+"""Tests for Celery worker process hooks."""
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from database import connection
+from database.connection import dispose_worker_state, get_celery_db_context, run_in_worker_loop
+from monitoring.metrics import worker_warmup_duration_seconds
+from tasks import worker
+from tests.conftest import TEST_DATABASE_URL
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Parent serves metrics recorded by a forked child, as a prefork worker does
+WORKER_METRICS_SCRIPT = textwrap.dedent(
+    """
+    import os, socket, urllib.request
+
+    import celery_app
+    from config import settings
+    from monitoring.metrics import record_ocr_pages, record_worker_warmup
+    from tasks import worker
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        settings.celery_metrics_port = sock.getsockname()[1]
+    worker.start_metrics_server()
+
+    pid = os.fork()
+    if pid == 0:
+        record_worker_warmup("model", 1.5)
+        record_ocr_pages("escalated", 2)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    url = f"http://127.0.0.1:{settings.celery_metrics_port}/metrics"
+    print(urllib.request.urlopen(url).read().decode())
+    """
+)
+
+
+def _observations(stage: str) -> float:
+    for metric in worker_warmup_duration_seconds.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == {"stage": stage}:
+                return sample.value
+    return 0.0
+
+
+class TestWarmUp:
+    """Tests for worker warm-up."""
+
+    def test_warm_up_loads_model_encodes_and_connects(self, mocker):
+        """Test that every stage runs once and its duration is recorded."""
+        service = mocker.MagicMock()
+        mocker.patch("services.analysis.get_analysis_service", return_value=service)
+        warm_up_database = mocker.patch("tasks.worker._warm_up_database", mocker.AsyncMock())
+        before = {stage: _observations(stage) for stage in ("model", "encode", "total")}
+
+        try:
+            worker.warm_up()
+        finally:
+            dispose_worker_state()
+
+        service.model.encode.assert_called_once_with(
+            [worker.WARMUP_TEXT], batch_size=1, convert_to_numpy=True
+        )
+        warm_up_database.assert_awaited_once()
+        for stage, count in before.items():
+            assert _observations(stage) == count + 1
+
+    def test_failed_warm_up_does_not_stop_the_worker(self, mocker):
+        """Test that warm-up errors are logged instead of raised."""
+        mocker.patch("tasks.worker.warm_up", side_effect=OSError("model download failed"))
+
+        worker.warm_up_worker_process()
+
+    def test_warm_up_can_be_disabled(self, mocker):
+        """Test that CELERY_WORKER_WARMUP=false skips warm-up."""
+        mocker.patch.object(worker.settings, "celery_worker_warmup", False)
+        warm_up = mocker.patch("tasks.worker.warm_up")
+
+        worker.warm_up_worker_process()
+
+        warm_up.assert_not_called()
+
+    def test_children_get_time_to_warm_up(self):
+        """Test that the pool waits past Celery's 4 s default for a warming-up child."""
+        from celery_app import celery_app
+
+        timeout = celery_app.conf.worker_proc_alive_timeout
+
+        assert timeout == worker.settings.celery_worker_proc_alive_timeout
+        assert timeout > 4.0
+
+
+class TestWorkerMetrics:
+    """Tests for exporting metrics recorded in worker children."""
+
+    def test_parent_serves_child_metrics(self, tmp_path):
+        """Test that metrics recorded in a child are scraped from the parent's port."""
+        metrics_dir = tmp_path / "metrics"
+        metrics_dir.mkdir()
+        (metrics_dir / "counter_1.db").write_bytes(b"left by a previous run")
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir)}
+        result = subprocess.run(
+            [sys.executable, "-c", WORKER_METRICS_SCRIPT],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert 'worker_warmup_duration_seconds_count{stage="model"} 1.0' in result.stdout
+        assert 'ocr_pages_total{path="escalated"} 2.0' in result.stdout
+
+    def test_metrics_server_needs_multiproc_dir(self, mocker):
+        """Test that no server starts without PROMETHEUS_MULTIPROC_DIR."""
+        mocker.patch.object(worker.settings, "celery_metrics_port", 9808)
+        mocker.patch.dict(os.environ, clear=False)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        start_http_server = mocker.patch("tasks.worker.start_http_server")
+
+        worker.start_metrics_server()
+
+        start_http_server.assert_not_called()
+
+
+class TestWorkerLoop:
+    """Tests for the per-process event loop and engine of Celery workers."""
+
+    @pytest.fixture(autouse=True)
+    def worker_state(self, mocker):
+        mocker.patch("database.connection.get_database_url", return_value=TEST_DATABASE_URL)
+        yield
+        dispose_worker_state()
+
+    def test_tasks_reuse_loop_and_connection(self):
+        """Test that consecutive tasks run on one loop and one pooled connection."""
+
+        async def backend_pid():
+            async with get_celery_db_context() as session:
+                return asyncio.get_running_loop(), await session.scalar(
+                    text("SELECT pg_backend_pid()")
+                )
+
+        first_loop, first_pid = run_in_worker_loop(backend_pid())
+        second_loop, second_pid = run_in_worker_loop(backend_pid())
+
+        assert first_loop is second_loop
+        assert first_pid == second_pid
+
+    def test_forked_child_gets_its_own_loop_and_engine(self, mocker):
+        """Test that state inherited from a parent process is not reused."""
+        parent_state = connection._get_worker_state()
+
+        mocker.patch("database.connection.os.getpid", return_value=parent_state.pid + 1)
+        child_state = connection._get_worker_state()
+        mocker.stopall()
+        connection._worker_state = parent_state
+        child_state.loop.close()
+
+        assert child_state is not parent_state
+        assert child_state.engine is not parent_state.engine
+        assert child_state.loop is not parent_state.loop
+        assert not parent_state.loop.is_closed()
+
+    def test_interrupted_task_is_cancelled(self):
+        """Test that a coroutine interrupted mid-run is not left pending on the loop."""
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        loop = connection._get_worker_state().loop
+        loop.call_later(0.01, interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            run_in_worker_loop(slow())
+
+        assert cancelled == [True]
+        assert asyncio.all_tasks(loop) == set()
@@ -45,6 +45,15 @@ export default function UploadPage() {
     setSelectedFile(null);
   };
 
+  const showAnalysis = async (analysisId: string) => {
+    // Get full analysis details
+    const analysis = await api.getAnalysis(analysisId);
+    setProcessingComplete(analysis);
+
+    // Navigate to results page
+    router.push(`/analysis/${analysisId}`);
+  };
+
   const handleUpload = async () => {
     if (!selectedFile) return;
 
@@ -61,8 +70,11 @@ export default function UploadPage() {
       setUploadSuccess(uploadResponse);
       startProcessing();
 
-      // Poll for processing completion
-      if (uploadResponse.document_id) {
+      if (uploadResponse.analysis_id) {
+        // Identical file was analyzed before; its result is ready
+        await showAnalysis(uploadResponse.analysis_id);
+      } else if (uploadResponse.document_id) {
+        // Poll for processing completion
         // Wait a moment for task to be created
         await new Promise((resolve) => setTimeout(resolve, 1000));
 
@@ -80,12 +92,7 @@ export default function UploadPage() {
           const analysisId = jobResult.result?.analysis?.analysis_id;
 
           if (analysisId) {
-            // Get full analysis details
-            const analysis = await api.getAnalysis(analysisId);
-            setProcessingComplete(analysis);
-
-            // Navigate to results page
-            router.push(`/analysis/${analysisId}`);
+            await showAnalysis(analysisId);
           } else {
             setProcessingError("Nie znaleziono ID analizy w wyniku zadania");
           }
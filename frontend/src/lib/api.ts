@@ -156,7 +156,50 @@ class ApiClient {
     return this.request<JobStatus>(`/api/v1/jobs/${jobId}`);
   }
 
-  // Poll for job completion
+  // Follow job progress pushed by the server (Server-Sent Events).
+  // Resolves null if the stream is unavailable or ends without a final status.
+  private streamJobStatus(
+    jobId: string,
+    timeout: number,
+    onStatusChange?: (status: JobStatus) => void
+  ): Promise<JobStatus | null> {
+    if (typeof EventSource === "undefined") {
+      return Promise.resolve(null);
+    }
+
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${this.baseUrl}/api/v1/jobs/${jobId}/events`);
+      // A silent stream may have missed the final event; let polling check the job
+      const timer = setTimeout(() => {
+        source.close();
+        resolve(null);
+      }, timeout);
+      const finish = () => {
+        clearTimeout(timer);
+        source.close();
+      };
+
+      source.addEventListener("status", (event) => {
+        const status: JobStatus = JSON.parse((event as MessageEvent).data);
+        onStatusChange?.(status);
+
+        if (status.status === "completed") {
+          finish();
+          resolve(status);
+        } else if (status.status === "failed") {
+          finish();
+          reject(new Error(status.error || "Job failed"));
+        }
+      });
+
+      source.onerror = () => {
+        finish();
+        resolve(null);
+      };
+    });
+  }
+
+  // Wait for job completion: streamed updates, falling back to polling
   async pollJobStatus(
     jobId: string,
     options: {
@@ -168,6 +211,11 @@ class ApiClient {
     const { interval = 2000, timeout = 300000, onStatusChange } = options;
     const startTime = Date.now();
 
+    const streamed = await this.streamJobStatus(jobId, timeout, onStatusChange);
+    if (streamed) {
+      return streamed;
+    }
+
     return new Promise((resolve, reject) => {
       const poll = async () => {
         try {
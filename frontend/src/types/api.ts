@@ -6,6 +6,7 @@ export interface DocumentUploadResponse {
   pages: number | null;
   upload_url: string;
   created_at: string;
+  analysis_id: string | null; // Set when the analysis of an identical file was reused
 }
 
 export interface DocumentResponse {